@@ -0,0 +1,167 @@
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from api.middleware import InstrumentationMiddleware
+from django.conf import settings
+from django.core import signals
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+HOT_VIEWS = frozenset((
+    'api:v1_titles-list',
+    'api:v1_titles-detail',
+    'api:v1_reviews-list',
+    'api:v1_reviews-detail',
+    'api:v1_comments-list',
+    'api:v1_comments-detail',
+))
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+def build_environ(scope, body):
+    """WSGI-окружение для Django 2.2 по HTTP-scope ASGI."""
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_PROTOCOL': 'HTTP/' + scope['http_version'],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    server = scope.get('server') or ('localhost', 80)
+    environ['SERVER_NAME'], environ['SERVER_PORT'] = server[0], str(server[1])
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        if name in environ:
+            value = environ[name] + ',' + value
+        environ[name] = value
+    return environ
+
+
+def response_headers(response):
+    if not response.has_header('Content-Length'):
+        response['Content-Length'] = str(len(response.content))
+    headers = [(name.encode('latin1'), value.encode('latin1'))
+               for name, value in response.items()]
+    headers.extend(
+        (b'Set-Cookie', cookie.output(header='').strip().encode('latin1'))
+        for cookie in response.cookies.values()
+    )
+    return headers
+
+
+class OrmThreadPool(ThreadPoolExecutor):
+    """Пул потоков с соединениями с базой, общий для циклов событий.
+
+    Цикл событий закрывает свой пул по умолчанию при завершении
+    (``asyncio.run``), а этот пул живёт до выхода из процесса.
+    """
+
+    def shutdown(self, wait=True, **kwargs):
+        pass
+
+
+class AsyncReadApplication:
+    """ASGI-приложение с асинхронным путём для горячих GET-запросов.
+
+    Анонимные GET/HEAD к спискам и карточкам произведений, отзывов и
+    комментариев обслуживаются без middleware, кроме сбора метрик:
+    соединение держит цикл событий, а работа с ORM и сериализация
+    выполняются в пуле из ASYNC_ORM_THREADS потоков. Ответы совпадают
+    с синхронными - вызываются те же вьюсеты с кешем, фильтрами и
+    пагинацией. Остальные запросы уходят в ``fallback``.
+
+    Пул становится пулом цикла событий по умолчанию, в котором
+    ``WsgiToAsgi`` и ``sync_to_async`` запускают синхронный код: у
+    каждого потока своё соединение с базой, и других потоков с
+    соединениями в процессе нет.
+    """
+
+    def __init__(self, fallback, executor=None):
+        self.fallback = fallback
+        self.executor = executor or OrmThreadPool(
+            max_workers=settings.ASYNC_ORM_THREADS,
+            thread_name_prefix='orm',
+        )
+        self.loop = None
+
+    async def __call__(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            loop.set_default_executor(self.executor)
+            self.loop = loop
+        match = self.resolve_hot(scope)
+        if match is None:
+            await self.fallback(scope, receive, send)
+            return
+        body = await self.read_body(receive)
+        response = await loop.run_in_executor(
+            self.executor, self.get_response, scope, body, match
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers(response),
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if scope['method'] == 'HEAD' else response.content,
+        })
+
+    @staticmethod
+    def resolve_hot(scope):
+        if (scope['type'] != 'http'
+                or scope['method'] not in READ_METHODS
+                or any(name == b'authorization'
+                       for name, _ in scope.get('headers', []))):
+            return None
+        try:
+            match = resolve(scope['path'])
+        except Resolver404:
+            return None
+        return match if match.view_name in HOT_VIEWS else None
+
+    @staticmethod
+    async def read_body(receive):
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        return body
+
+    @staticmethod
+    def get_response(scope, body, match):
+        environ = build_environ(scope, body)
+        # Сигналы запроса, как у WSGIHandler: закрывают устаревшие
+        # соединения с базой потока пула и сбрасывают журнал запросов.
+        signals.request_started.send(sender=AsyncReadApplication,
+                                     environ=environ)
+        try:
+            handler = InstrumentationMiddleware(convert_exception_to_response(
+                lambda request: match.func(request, *match.args,
+                                           **match.kwargs)
+            ))
+            request = WSGIRequest(environ)
+            request.resolver_match = match
+            response = handler(request)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+        finally:
+            signals.request_finished.send(sender=AsyncReadApplication)
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.tokens import get_token_version
+
+User = get_user_model()
+
+CLAIMS = ('username', 'role')
+VERSION_CLAIM = 'ver'
+
+
+def access_token_for(user):
+    """Токен доступа с ролью и версией токенов пользователя."""
+    token = AccessToken.for_user(user)
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication без запроса пользователя к базе.
+
+    Пользователь собирается из утверждений токена: для прав доступа
+    достаточно id и роли. Токен отклоняется, если его версия отстала
+    от текущей версии пользователя (смена роли, имени, блокировка или
+    удаление); версии хранятся в кеше TOKEN_VERSION_CACHE_TTL секунд.
+    Токены, выданные без версии, проверяются по базе, как раньше.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if get_token_version(user_id) != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed('Токен отозван',
+                                       code='token_revoked')
+        # Несохранённый экземпляр: save() не перезапишет строку в базе
+        # пустыми полями, а попытается вставить новую и упадёт.
+        return User(
+            token_version=validated_token[VERSION_CLAIM],
+            **{claim: validated_token[claim] for claim in CLAIMS},
+            **{api_settings.USER_ID_FIELD: user_id},
+        )
@@ -0,0 +1,84 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'table_version:{}'
+MODIFIED_KEY = 'table_modified:{}'
+
+
+def get_cache(alias=None):
+    return caches[alias or settings.API_CACHE_ALIAS]
+
+
+def with_all_scopes(tables):
+    """Таблицы и области вместе с общими областями их таблиц."""
+    tables = list(tables)
+    return tables + sorted({
+        all_scopes(table.split(':')[0]) for table in tables if ':' in table
+    } - set(tables))
+
+
+def get_table_versions(tables):
+    """Версии таблиц: меняются при каждой записи в таблицу.
+
+    Кроме имён таблиц принимаются и более узкие области, например
+    ``reviews_review:title=1``; к ним добавляется версия всех областей
+    таблицы (``all_scopes``). Отсутствующая версия заводится от
+    текущего времени, чтобы после вытеснения ключа из кеша она не
+    совпала с одной из прежних.
+    """
+    cache = get_cache()
+    keys = {table: VERSION_KEY.format(table)
+            for table in with_all_scopes(tables)}
+    stored = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in stored]
+    if missing:
+        initial = int(time.time() * 1000)
+        for key in missing:
+            cache.add(key, initial, timeout=None)
+        stored.update(cache.get_many(missing))
+    return {table: stored.get(key, 0) for table, key in keys.items()}
+
+
+def get_tables_modified(tables):
+    """Время последней записи в любую из таблиц или None."""
+    stored = get_cache().get_many(
+        [MODIFIED_KEY.format(table) for table in with_all_scopes(tables)]
+    )
+    return max(stored.values(), default=None)
+
+
+def bump_table_versions(*tables):
+    cache = get_cache()
+    modified = time.time()
+    for table in tables:
+        key = VERSION_KEY.format(table)
+        if not cache.add(key, int(modified * 1000), timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, int(modified * 1000), timeout=None)
+        cache.set(MODIFIED_KEY.format(table), modified, timeout=None)
+
+
+def scope(table, **filters):
+    """Область внутри таблицы, например отзывы одного произведения."""
+    return table + ':' + ','.join(
+        f'{name}={value}' for name, value in sorted(filters.items())
+    )
+
+
+def all_scopes(table):
+    """Область, сдвиг которой сбрасывает все узкие области таблицы.
+
+    Нужна записям в обход сигналов (загрузка csv), после которых
+    изменившиеся области неизвестны или их слишком много.
+    """
+    return table + ':*'
+
+
+def queryset_tables(queryset):
+    return sorted({
+        join.table_name for join in queryset.query.alias_map.values()
+    } | {queryset.model._meta.db_table})
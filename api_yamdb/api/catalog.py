@@ -0,0 +1,87 @@
+import copy
+import threading
+import time
+from collections import namedtuple
+
+from api.cache import get_table_versions
+from django.conf import settings
+from reviews.models import Category, Genre
+
+Snapshot = namedtuple('Snapshot', ('version', 'loaded', 'by_id', 'by_slug'))
+
+
+class Catalog:
+    """Копия небольшой справочной таблицы в памяти процесса.
+
+    Актуальность сверяется с версией таблицы в общем кеше: запись в
+    таблицу в любом воркере сдвигает версию, и при следующем обращении
+    остальные воркеры перечитывают справочник одним запросом. Копия
+    старше CATALOG_SNAPSHOT_TTL перечитывается и при прежней версии:
+    так записи, не дошедшие до кеша (локальный кеш процесса, вытеснение
+    ключа), видны не позже чем через это время.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._snapshot = Snapshot(None, 0, {}, {})
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Справочник - общий объект процесса; DRF копирует аргументы
+        # полей при создании сериализатора.
+        return self
+
+    @staticmethod
+    def is_fresh(snapshot, version):
+        return (snapshot.version == version
+                and time.monotonic() - snapshot.loaded
+                < settings.CATALOG_SNAPSHOT_TTL)
+
+    def snapshot(self):
+        table = self.model._meta.db_table
+        version = get_table_versions((table,))[table]
+        snapshot = self._snapshot
+        if self.is_fresh(snapshot, version):
+            return snapshot
+        with self._lock:
+            if not self.is_fresh(self._snapshot, version):
+                objects = list(self.model.objects.all())
+                self._snapshot = Snapshot(
+                    version,
+                    time.monotonic(),
+                    {obj.pk: obj for obj in objects},
+                    {obj.slug: obj for obj in objects},
+                )
+            return self._snapshot
+
+    def for_request(self, request):
+        """Копия справочника, одна на запрос.
+
+        Версия сверяется с кешем один раз за запрос, а не для каждой
+        строки ответа или элемента пакета.
+        """
+        if request is None:
+            return self.snapshot()
+        snapshots = getattr(request, '_catalog_snapshots', None)
+        if snapshots is None:
+            snapshots = {}
+            request._catalog_snapshots = snapshots
+        if self.model not in snapshots:
+            snapshots[self.model] = self.snapshot()
+        return snapshots[self.model]
+
+    def get_by_slug(self, slug, request=None):
+        obj = self.for_request(request).by_slug.get(slug)
+        return copy.copy(obj) if obj is not None else None
+
+    def ids_for_slugs(self, slugs, request=None):
+        by_slug = self.for_request(request).by_slug
+        return [by_slug[slug].pk for slug in slugs if slug in by_slug]
+
+    def objects_for_ids(self, ids, request=None):
+        by_id = self.for_request(request).by_id
+        return [by_id[pk] for pk in ids if pk in by_id]
+
+
+genres = Catalog(Genre)
+categories = Catalog(Category)
@@ -0,0 +1,128 @@
+import csv
+from collections import defaultdict, namedtuple
+from datetime import datetime, time
+from itertools import islice
+
+from api.catalog import categories, genres
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from reviews.models import Comment, Review, Title, TitleGenre
+
+TITLE_COLUMNS = ('id', 'name', 'year', 'description', 'rating',
+                 'reviews_count', 'category', 'genre')
+REVIEW_COLUMNS = ('id', 'title_id', 'author', 'text', 'score', 'pub_date')
+COMMENT_COLUMNS = ('id', 'review_id', 'author', 'text', 'pub_date')
+
+LOOKUPS = {'author': 'author__username'}
+
+Dataset = namedtuple('Dataset', ('columns', 'rows', 'supports_since'))
+
+
+def parse_since(value):
+    """Дата или дата и время ISO 8601; None, если разобрать не удалось."""
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is None:
+                return None
+            since = datetime.combine(date, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def title_rows(since):
+    """Произведения с жанрами: один запрос к TitleGenre на пачку."""
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    rows = Title.objects.order_by('id').values(
+        'id', 'name', 'year', 'description', 'rating', 'reviews_count',
+        'category_id',
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunks(rows, chunk_size):
+        genre_ids = defaultdict(list)
+        for title_id, genre_id in TitleGenre.objects.filter(
+            title_id__in=[row['id'] for row in chunk]
+        ).values_list('title_id', 'genre_id'):
+            genre_ids[title_id].append(genre_id)
+        by_category_id = categories.snapshot().by_id
+        by_genre_id = genres.snapshot().by_id
+        for row in chunk:
+            category = by_category_id.get(row.pop('category_id'))
+            row['category'] = category.slug if category else None
+            row['genre'] = sorted(by_genre_id[genre_id].slug
+                                  for genre_id in genre_ids[row['id']]
+                                  if genre_id in by_genre_id)
+            yield row
+
+
+def dated_rows(queryset, columns):
+    lookups = [LOOKUPS.get(column, column) for column in columns]
+
+    def rows(since):
+        selected = queryset.order_by('pub_date', 'id')
+        if since is not None:
+            selected = selected.filter(pub_date__gte=since)
+        for values in selected.values_list(*lookups).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE
+        ):
+            yield dict(zip(columns, values))
+    return rows
+
+
+DATASETS = {
+    'titles': Dataset(TITLE_COLUMNS, title_rows, False),
+    'reviews': Dataset(REVIEW_COLUMNS,
+                       dated_rows(Review.objects.all(), REVIEW_COLUMNS),
+                       True),
+    'comments': Dataset(COMMENT_COLUMNS,
+                        dated_rows(Comment.objects.all(), COMMENT_COLUMNS),
+                        True),
+}
+
+
+def to_ndjson(columns, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode({column: row[column] for column in columns})
+        yield '\n'
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if isinstance(value, list):
+        return ','.join(value)
+    if isinstance(value, datetime):
+        return DjangoJSONEncoder().default(value)
+    return value
+
+
+def to_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_value(row[column]) for column in columns])
+
+
+OUTPUTS = {
+    'ndjson': (to_ndjson, 'application/x-ndjson'),
+    'csv': (to_csv, 'text/csv; charset=utf-8'),
+}
@@ -1,16 +1,58 @@
 import django_filters
-from reviews.models import Title
+from api.catalog import categories, genres
+from api.search import search_titles
+from django.db.models import F
+from rest_framework.filters import OrderingFilter
+from reviews.models import Title, TitleGenre
+
+
+def split_slugs(value):
+    return [slug.strip() for slug in value.split(',') if slug.strip()]
 
 
 class TitleFilter(django_filters.FilterSet):
+    search = django_filters.CharFilter(method=search_titles)
     name = django_filters.CharFilter(lookup_expr='contains')
-    genre = django_filters.CharFilter(
-        field_name='genre__slug', lookup_expr='contains'
-    )
-    category = django_filters.CharFilter(
-        field_name='category__slug', lookup_expr='contains'
-    )
+    genre = django_filters.CharFilter(method='filter_genre')
+    category = django_filters.CharFilter(method='filter_category')
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category',)
+
+    def filter_genre(self, queryset, name, value):
+        genre_ids = genres.ids_for_slugs(split_slugs(value), self.request)
+        return queryset.filter(pk__in=TitleGenre.objects.filter(
+            genre_id__in=genre_ids
+        ).values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category_id__in=categories.ids_for_slugs(split_slugs(value),
+                                                     self.request)
+        )
+
+
+def ordering_expressions(ordering):
+    """Сортировка с NULL в конце и ``id`` для однозначного порядка.
+
+    Направление ``id`` совпадает с последним полем, поэтому запрос
+    обслуживает один индекс (поле, id), прочитанный в нужную сторону.
+    """
+    expressions = [
+        F(field[1:]).desc(nulls_last=True) if field.startswith('-')
+        else F(field).asc(nulls_last=True)
+        for field in ordering
+    ]
+    expressions.append('-id' if ordering[-1].startswith('-') else 'id')
+    return expressions
+
+
+class NullsLastOrderingFilter(OrderingFilter):
+    """``?ordering=`` по ``view.ordering_fields``; NULL всегда в конце."""
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*ordering_expressions(ordering))
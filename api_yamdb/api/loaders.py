@@ -0,0 +1,44 @@
+from api.cache import scope
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+# Область имён пользователей: от неё зависят закешированные ответы с
+# именами авторов. Сдвигается при смене username и удалении, но не при
+# регистрации или входе.
+USERNAMES_SCOPE = scope(User._meta.db_table, field='username')
+
+
+class AuthorLoader:
+    """Карта идентичности авторов в пределах одного запроса.
+
+    Имена авторов подгружаются пачкой одним запросом, а повторные
+    обращения к уже известным авторам в базу не ходят.
+    """
+
+    def __init__(self):
+        self.usernames = {}
+
+    @classmethod
+    def for_request(cls, request):
+        if request is None:
+            return cls()
+        loader = getattr(request, '_author_loader', None)
+        if loader is None:
+            loader = cls()
+            request._author_loader = loader
+        return loader
+
+    def load(self, author_ids):
+        missing = set(author_ids) - self.usernames.keys()
+        missing.discard(None)
+        if missing:
+            self.usernames.update(
+                User.objects.filter(pk__in=missing).values_list(
+                    'pk', 'username'
+                )
+            )
+
+    def username(self, author_id):
+        self.load((author_id,))
+        return self.usernames.get(author_id)
@@ -0,0 +1,117 @@
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Семейства метрик: имя -> (описание, границы корзин).
+HISTOGRAMS = {
+    'yamdb_request_duration_seconds': (
+        'Время обработки запроса', DURATION_BUCKETS,
+    ),
+    'yamdb_request_db_queries': (
+        'Число запросов к базе за запрос', QUERY_BUCKETS,
+    ),
+    'yamdb_request_db_duration_seconds': (
+        'Время запросов к базе за запрос', DURATION_BUCKETS,
+    ),
+}
+REQUESTS_TOTAL = 'yamdb_requests_total'
+# Методы вне этого набора клиент может прислать любыми, поэтому они
+# учитываются одной серией ``other``.
+METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+))
+OTHER_METHOD = 'other'
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами: память не растёт."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+def labels(**values):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in values.items()
+    )
+
+
+class Registry:
+    """Метрики запросов процесса по имени вьюхи и методу.
+
+    Имена вьюх берутся из URLconf, запросы без совпадения учитываются
+    как ``unmatched``, нестандартные методы - как ``other``, поэтому
+    число серий ограничено.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.histograms = {name: {} for name in HISTOGRAMS}
+            self.requests = {}
+
+    def observe(self, view, method, status, duration, queries, db_time):
+        key = (view, method if method in METHODS else OTHER_METHOD)
+        values = zip(HISTOGRAMS, (duration, queries, db_time))
+        with self.lock:
+            for name, value in values:
+                series = self.histograms[name]
+                if key not in series:
+                    series[key] = Histogram(HISTOGRAMS[name][1])
+                series[key].observe(value)
+            status_key = key + (status,)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+
+    def render(self):
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines = [f'# HELP {REQUESTS_TOTAL} Число обработанных запросов',
+                 f'# TYPE {REQUESTS_TOTAL} counter']
+        with self.lock:
+            for (view, method, status), count in sorted(
+                    self.requests.items()):
+                lines.append('{}{{{}}} {}'.format(
+                    REQUESTS_TOTAL,
+                    labels(view=view, method=method, status=status), count
+                ))
+            for name, (description, _) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {description}',
+                          f'# TYPE {name} histogram']
+                for (view, method), histogram in sorted(
+                        self.histograms[name].items()):
+                    lines += render_histogram(
+                        name, labels(view=view, method=method), histogram
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+def render_histogram(name, series_labels, histogram):
+    for bound, count in histogram.cumulative():
+        yield '{}_bucket{{{},le="{}"}} {}'.format(
+            name, series_labels, bound, count
+        )
+    yield f'{name}_sum{{{series_labels}}} {histogram.sum}'
+    yield f'{name}_count{{{series_labels}}} {histogram.count}'
+
+
+registry = Registry()
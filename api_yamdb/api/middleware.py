@@ -0,0 +1,83 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from api.metrics import registry
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Сколько разных SQL-выражений запоминается за один запрос.
+MAX_STATEMENTS = 100
+
+
+class QueryRecorder:
+    """Обёртка execute: число и время запросов к базе, время по SQL."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if sql in self.statements or len(
+                    self.statements) < MAX_STATEMENTS:
+                count, total = self.statements.get(sql, (0, 0))
+                self.statements[sql] = (count + 1, total + elapsed)
+
+    def top(self, limit):
+        return sorted(self.statements.items(),
+                      key=lambda item: item[1][1], reverse=True)[:limit]
+
+
+class InstrumentationMiddleware:
+    """Время запроса, число и время запросов к базе по имени вьюхи.
+
+    Значения попадают в гистограммы api.metrics; запросы дольше
+    SLOW_REQUEST_THRESHOLD секунд пишутся в журнал вместе с самыми
+    долгими SQL-выражениями. Запросы к базе при чтении потокового
+    ответа уже после выхода из вьюхи не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        registry.observe(view, request.method, response.status_code,
+                         duration, recorder.count, recorder.duration)
+        if duration >= settings.SLOW_REQUEST_THRESHOLD:
+            log_slow_request(request, view, response, duration, recorder)
+        return response
+
+
+def log_slow_request(request, view, response, duration, recorder):
+    statements = '\n'.join(
+        f'  {count} x {total * 1000:.1f} мс: {sql}'
+        for sql, (count, total) in recorder.top(
+            settings.SLOW_REQUEST_STATEMENTS
+        )
+    )
+    logger.warning(
+        'Медленный запрос %s %s (%s, %s): %.1f мс, запросов к базе %s '
+        'за %.1f мс\n%s',
+        request.method, request.get_full_path(), view,
+        response.status_code, duration * 1000, recorder.count,
+        recorder.duration * 1000, statements,
+    )
@@ -1,4 +1,79 @@
-from rest_framework import mixins, viewsets
+import hashlib
+from urllib.parse import urlencode
+
+from api.cache import get_cache, get_table_versions, get_tables_modified
+from django.conf import settings
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+
+
+class CachedResponseMixin:
+    """Кеш ответов list/retrieve для анонимных GET-запросов.
+
+    Ключ строится из пути, отсортированных параметров запроса, формата
+    ответа и версий областей из ``get_response_cache_scopes``; версии
+    сдвигаются сигналами при записи, поэтому ответы не нужно удалять
+    из кеша явно. ETag совпадает с ключом, и повторный запрос с
+    If-None-Match получает 304 без обращения к базе.
+    """
+
+    response_cache_models = ()
+
+    def get_response_cache_scopes(self):
+        return [model._meta.db_table for model in self.response_cache_models]
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request, scopes):
+        query = urlencode(sorted(
+            (name, value) for name, values in request.query_params.lists()
+            for value in values
+        ))
+        versions = get_table_versions(scopes)
+        raw = repr((request.get_host(), request.path, query,
+                    request.accepted_renderer.format,
+                    sorted(versions.items())))
+        return 'response:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        scopes = self.get_response_cache_scopes()
+        key = self.get_response_cache_key(request, scopes)
+        headers = {'ETag': quote_etag(key)}
+        modified = get_tables_modified(scopes)
+        if modified is not None:
+            headers['Last-Modified'] = http_date(modified)
+        if self.is_not_modified(request, headers['ETag'], modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED,
+                            headers=headers)
+        cache = get_cache(settings.RESPONSE_CACHE_ALIAS)
+        data = cache.get(key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(key, data, settings.RESPONSE_CACHE_TTL)
+        return Response(data, headers=headers)
+
+    @staticmethod
+    def is_not_modified(request, etag, modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            return etag in (tag.strip() for tag in if_none_match.split(','))
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+        )
+        return (if_modified_since is not None and modified is not None
+                and int(modified) <= if_modified_since)
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -0,0 +1,284 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections import OrderedDict, namedtuple
+from functools import reduce
+from operator import or_
+
+from api.cache import get_cache, get_table_versions, queryset_tables
+from django.conf import settings
+from django.core.exceptions import (EmptyResultSet, FieldDoesNotExist,
+                                    ValidationError)
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+KeysetCursor = namedtuple('KeysetCursor', ('reverse', 'position'))
+
+
+def estimate_count(queryset):
+    """Оценка планировщика PostgreSQL для выборки без фильтров."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < settings.PAGINATION_ESTIMATE_THRESHOLD:
+        return None
+    return row[0]
+
+
+def cached_count(queryset):
+    tables = queryset_tables(queryset)
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.md5(
+        repr((sql, params, get_table_versions(tables))).encode()
+    ).hexdigest()
+    key = f'count:{queryset.db}:{digest}'
+    cache = get_cache()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TTL)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    count_exact = True
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate is not None:
+            self.count_exact = False
+            return estimate
+        return cached_count(self.object_list)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """PageNumberPagination без COUNT(*) на каждый запрос.
+
+    Число объектов берётся из кеша, который сбрасывается при записи в
+    участвующие в выборке таблицы, а для больших таблиц без фильтров -
+    из статистики планировщика. Поле ``count_exact`` сообщает, точно ли
+    значение ``count``.
+    """
+
+    django_paginator_class = CachedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_exact', self.page.paginator.count_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_exact'] = {
+            'type': 'boolean',
+        }
+        return response_schema
+
+
+def invert(field):
+    return field[1:] if field.startswith('-') else '-' + field
+
+
+def keyset_condition(ordering, position):
+    """Строки после ``position`` в порядке ``ordering``.
+
+    (a, b, id) > (x, y, z) раскрывается в a > x OR a = x AND b > y OR
+    ..., направление сравнения каждого поля - по его знаку. Условие
+    a >= x дублирует первое поле, чтобы индекс читался с нужного места.
+    """
+    names = [field.lstrip('-') for field in ordering]
+    terms = []
+    for index, field in enumerate(ordering):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        terms.append(Q(
+            *(Q(**{name: value})
+              for name, value in zip(names[:index], position)),
+            **{f'{names[index]}__{lookup}': position[index]}
+        ))
+    lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+    return Q(**{f'{names[0]}__{lookup}': position[0]}) & reduce(or_, terms)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Курсорная пагинация по значениям всех полей сортировки.
+
+    Курсор хранит значения полей ``view.cursor_ordering`` у крайней
+    строки страницы, и соседняя страница выбирается сравнением с ними
+    без OFFSET - в отличие от CursorPagination DRF, которая ключует
+    курсор только первым полем и пропускает одинаковые значения
+    смещением. Последнее поле сортировки должно быть уникальным.
+    """
+
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.cursor = KeysetCursor(reverse=False, position=None)
+        position = self.clean_position(queryset.model, self.cursor.position)
+        ordering = self.ordering
+        if self.cursor.reverse:
+            ordering = tuple(invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_condition(ordering, position))
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if self.cursor.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def clean_position(self, model, position):
+        if position is None:
+            return None
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (FieldDoesNotExist, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_position(self, instance):
+        return [
+            instance.serializable_value(field.lstrip('-'))
+            for field in self.ordering
+        ]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Перед пустой страницей, полученной назад, строк нет: дальше
+        # идёт первая страница.
+        position = self.get_position(self.page[-1]) if self.page else None
+        return self.encode_cursor(
+            KeysetCursor(reverse=False, position=position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        # После пустой страницы строк нет: назад идёт последняя страница.
+        position = self.get_position(self.page[0]) if self.page else None
+        return self.encode_cursor(
+            KeysetCursor(reverse=True, position=position)
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return KeysetCursor(reverse=bool(data['r']),
+                                position=data.get('p'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        data = {'r': int(cursor.reverse)}
+        if cursor.position is not None:
+            data['p'] = cursor.position
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, default=str, separators=(',', ':')).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   encoded)
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """Постраничная пагинация с выбором курсорного режима.
+
+    По умолчанию работает как CachedCountPagination. Параметр
+    ``?paginator=cursor`` (или переданный ``cursor``) включает keyset-
+    пагинацию по ``view.cursor_ordering`` без OFFSET и COUNT(*).
+    """
+
+    mode_query_param = 'paginator'
+    cursor_mode = 'cursor'
+    page_number_class = CachedCountPagination
+    cursor_class = KeysetCursorPagination
+
+    def __init__(self):
+        self.page_number = self.page_number_class()
+        self.cursor = self.cursor_class()
+        self.active = self.page_number
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or self.cursor.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = (self.cursor if self.is_cursor_mode(request)
+                       else self.page_number)
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_results(self, data):
+        return self.active.get_results(data)
+
+    def get_schema_fields(self, view):
+        return (self.page_number.get_schema_fields(view)
+                + self.cursor.get_schema_fields(view))
+
+    def get_schema_operation_parameters(self, view):
+        return (self.page_number.get_schema_operation_parameters(view)
+                + self.cursor.get_schema_operation_parameters(view))
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.active, 'display_page_controls', False)
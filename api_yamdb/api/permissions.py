@@ -12,7 +12,7 @@ class ModeratorAdminAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.pk
             or request.user.role in (
                 settings.MODERATOR_ROLE, settings.ADMINISTRATOR_ROLE)
         )
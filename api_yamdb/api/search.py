@@ -0,0 +1,86 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+WORD_RE = re.compile(r'\w+')
+
+
+def trigrams(text):
+    """Триграммы строки по правилам pg_trgm."""
+    result = set()
+    for word in WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def trigram_similarity(left, right):
+    """Python-реализация similarity() из pg_trgm для SQLite."""
+    left, right = trigrams(left), trigrams(right)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(
+            'SIMILARITY', 2, trigram_similarity
+        )
+
+
+class Similarity(Func):
+    function = 'SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, expression, string, **extra):
+        super().__init__(expression, Value(string), **extra)
+
+
+def rank_expression(fields, value):
+    similarities = [
+        Similarity(F(field.lstrip('^=@$')), value) for field in fields
+    ]
+    if len(similarities) == 1:
+        return similarities[0]
+    return Greatest(*similarities)
+
+
+def search_queryset(queryset, fields, value):
+    """Поиск подстроки по полям с ранжированием по похожести.
+
+    На PostgreSQL условия ``icontains`` обслуживаются GIN-индексами
+    pg_trgm по ``UPPER(поле)``, ранг считает ``similarity()``.
+    """
+    value = value.strip()
+    if not value:
+        return queryset
+    condition = reduce(or_, (
+        Q(**{f'{field}__icontains': value}) for field in fields
+    ))
+    return queryset.filter(condition).annotate(
+        search_rank=rank_expression(fields, value)
+    ).order_by('-search_rank', *queryset.model._meta.ordering)
+
+
+def search_titles(queryset, name, value):
+    return search_queryset(queryset, ('name', 'description'), value)
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """SearchFilter с сортировкой результатов по похожести."""
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = super().filter_queryset(request, queryset, view)
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        return queryset.annotate(
+            search_rank=rank_expression(search_fields,
+                                        ' '.join(search_terms))
+        ).order_by('-search_rank', *queryset.model._meta.ordering)
@@ -1,13 +1,17 @@
+from api.authentication import access_token_for
+from api.catalog import categories, genres
+from api.loaders import AuthorLoader
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.encoding import smart_str
 from rest_framework import exceptions, serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueTogetherValidator
 from rest_framework_simplejwt.serializers import PasswordField
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleStats)
 
 User = get_user_model()
 
@@ -26,24 +30,105 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+class CatalogGenreField(serializers.Field):
+    """Жанры произведения из справочника по предвыбранным связям."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        title_genres = genres.objects_for_ids(
+            (link.genre_id for link in title.titlegenre_set.all()),
+            self.context.get('request'),
+        )
+        return GenreSerializer(
+            sorted(title_genres, key=lambda genre: genre.name), many=True
+        ).data
+
+
+class CatalogCategoryField(serializers.Field):
+    """Категория произведения из справочника по category_id."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        category = categories.for_request(
+            self.context.get('request')
+        ).by_id.get(title.category_id)
+        if category is None:
+            return None
+        return CategorySerializer(category).data
+
+
+class CatalogSlugRelatedField(SlugRelatedField):
+    """SlugRelatedField, который проверяет слаги по справочнику."""
+
+    def __init__(self, catalog, **kwargs):
+        self.catalog = catalog
+        kwargs.setdefault('slug_field', 'slug')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = self.catalog.get_by_slug(data, self.context.get('request'))
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return obj
+
+
+def title_stats(title):
+    """Статистика произведения; без отзывов строки нет - нули."""
+    return getattr(title, 'stats', None) or TitleStats(title=title)
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    rating = serializers.FloatField(source='title.rating', read_only=True)
+    scores = serializers.DictField(child=serializers.IntegerField(),
+                                   read_only=True)
+
+    class Meta:
+        fields = ('title', 'rating', 'reviews_count', 'scores')
+        model = TitleStats
+
+
 class TitleSerializer(serializers.ModelSerializer):
-    genre = GenreSerializer(many=True)
-    category = CategorySerializer()
+    genre = CatalogGenreField()
+    category = CatalogCategoryField()
     rating = serializers.FloatField(max_value=10, min_value=1)
+    stats = serializers.SerializerMethodField()
 
     class Meta:
         fields = ('id', 'name', 'year',
                   'rating', 'description',
-                  'genre', 'category')
+                  'genre', 'category', 'stats')
         model = Title
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Статистика отзывов выводится только по запросу (?stats=1).
+        if not self.context.get('with_stats'):
+            self.fields.pop('stats')
+
+    def get_stats(self, title):
+        stats = title_stats(title)
+        return {'reviews_count': stats.reviews_count,
+                'scores': {str(score): count
+                           for score, count in stats.scores.items()}}
+
 
 class TitlePostSerializer(serializers.ModelSerializer):
-    genre = SlugRelatedField(many=True, queryset=Genre.objects.all(),
-                             slug_field='slug')
+    genre = CatalogSlugRelatedField(genres, many=True,
+                                    queryset=Genre.objects.all())
 
-    category = SlugRelatedField(queryset=Category.objects.all(),
-                                slug_field='slug')
+    category = CatalogSlugRelatedField(categories,
+                                       queryset=Category.objects.all())
 
     class Meta:
         fields = ('id', 'name', 'year', 'description',
@@ -62,14 +147,115 @@ class TitlePostSerializer(serializers.ModelSerializer):
         return value
 
 
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """Массовое создание произведений одной транзакцией.
+
+    Уникальность пары (name, category) проверяется одним запросом на
+    весь пакет, произведения и связи с жанрами вставляются через
+    bulk_create.
+    """
+
+    @staticmethod
+    def unique_error_message():
+        return UniqueTogetherValidator.message.format(
+            field_names='name, category'
+        )
+
+    def get_unique_errors(self):
+        keys = [(item['name'], item['category'].pk)
+                for item in self.validated_data]
+        existing = set(Title.objects.filter(
+            name__in={name for name, _ in keys}
+        ).values_list('name', 'category_id'))
+        message = self.unique_error_message()
+        errors = []
+        for key in keys:
+            if key in existing:
+                errors.append({'non_field_errors': [message]})
+            else:
+                errors.append({})
+            existing.add(key)
+        return errors if any(errors) else []
+
+    def create(self, validated_data):
+        titles = Title.objects.bulk_create(
+            Title(name=item['name'],
+                  year=item['year'],
+                  description=item.get('description', ''),
+                  category=item['category'])
+            for item in validated_data
+        )
+        if any(title.pk is None for title in titles):
+            ids = dict(
+                ((name, category_id), pk)
+                for pk, name, category_id in Title.objects.filter(
+                    name__in={title.name for title in titles}
+                ).values_list('pk', 'name', 'category_id')
+            )
+            for title in titles:
+                title.pk = ids[(title.name, title.category_id)]
+        for title, item in zip(titles, validated_data):
+            title.genres = list(
+                {genre.pk: genre for genre in item['genre']}.values()
+            )
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title_id=title.pk, genre_id=genre.pk)
+            for title in titles for genre in title.genres
+        )
+        return titles
+
+    def to_representation(self, titles):
+        return [
+            {
+                'id': title.pk,
+                'name': title.name,
+                'year': title.year,
+                'description': title.description,
+                'genre': [genre.slug for genre in title.genres],
+                'category': title.category.slug,
+            }
+            for title in titles
+        ]
+
+
+class TitleBulkSerializer(TitlePostSerializer):
+
+    class Meta(TitlePostSerializer.Meta):
+        validators = []
+        list_serializer_class = TitleBulkListSerializer
+
+
+class AuthorField(SlugRelatedField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'username')
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return AuthorLoader.for_request(
+            self.context.get('request')
+        ).username(instance.author_id)
+
+    def to_representation(self, value):
+        return value
+
+
+class AuthorBatchListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        AuthorLoader.for_request(self.context.get('request')).load(
+            item.author_id for item in items
+        )
+        return super().to_representation(items)
+
+
 class ReviewSerializer(serializers.ModelSerializer):
-    author = SlugRelatedField(slug_field='username',
-                              read_only=True,
-                              default=serializers.CurrentUserDefault())
+    author = AuthorField(read_only=True,
+                         default=serializers.CurrentUserDefault())
 
     class Meta:
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
+        list_serializer_class = AuthorBatchListSerializer
         read_only_fields = ('id', 'author', 'pub_date')
 
     def validate(self, data):
@@ -84,11 +270,12 @@ class ReviewSerializer(serializers.ModelSerializer):
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    author = SlugRelatedField(slug_field='username', read_only=True)
+    author = AuthorField(read_only=True)
 
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+        list_serializer_class = AuthorBatchListSerializer
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -145,4 +332,4 @@ class MyTokenObtainSerializer(serializers.Serializer):
             attrs['confirmation_code']
         ):
             raise exceptions.ValidationError('Невалидный код подтверждения')
-        return {'access_token': str(AccessToken.for_user(self.user))}
+        return {'access_token': str(access_token_for(self.user))}
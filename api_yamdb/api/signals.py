@@ -0,0 +1,120 @@
+from api.cache import all_scopes, bump_table_versions, scope
+from api.loaders import USERNAMES_SCOPE
+from api.search import register_sqlite_functions
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+
+User = get_user_model()
+
+# Таблицы, версии которых сдвигаются при записи в модель. Запись
+# отзыва меняет рейтинг произведения, связь с жанром - выборки
+# произведений с фильтром по жанру. Записи пользователей сдвигают
+# версии выборочно (bump_user_versions).
+INVALIDATED_TABLES = {
+    Category: (Category, Title),
+    Genre: (Genre, TitleGenre, Title),
+    Title: (Title,),
+    TitleGenre: (TitleGenre, Title),
+    Review: (Review, Title),
+    Comment: (Comment,),
+    User: (User,),
+}
+
+# Узкие области: кеш отзывов одного произведения и комментариев
+# одного отзыва сбрасывается только записью в них. Область задаётся
+# именем, внешним ключом, по значению которого она выделяется, и
+# атрибутом, в котором модель помнит значение ключа из базы: перенос
+# строки в другую область сбрасывает и прежнюю.
+INVALIDATED_SCOPES = {
+    Review: ('title', 'title_id', '_rated_title_id'),
+    Comment: ('review', 'review_id', None),
+}
+
+
+def bump_after_commit(tables, using=None):
+    bump_table_versions(*tables)
+    # Сигнал приходит до фиксации транзакции: читатель, успевший между
+    # записью и фиксацией взять новую версию и старые строки, закеширует
+    # их под этой версией. Повторный сдвиг после фиксации делает такой
+    # ответ недостижимым; вне транзакции колбэк выполняется сразу.
+    transaction.on_commit(lambda: bump_table_versions(*tables),
+                          using=using)
+
+
+def invalidate(model, references=None, using=None):
+    """Сдвигает версии таблиц и областей после записи в модель.
+
+    ``references`` - значения внешних ключей записанных строк по
+    attname, из них строятся узкие области модели. Без них (запись в
+    обход сигналов, например загрузка csv) сдвигаются все области.
+    """
+    table = model._meta.db_table
+    tables = [related._meta.db_table
+              for related in INVALIDATED_TABLES[model]]
+    if references is None:
+        tables.append(all_scopes(table))
+    elif model in INVALIDATED_SCOPES:
+        name, attname, _ = INVALIDATED_SCOPES[model]
+        tables.extend(scope(table, **{name: value})
+                      for value in sorted(references.get(attname, ())))
+    bump_after_commit(tables, using)
+
+
+def remember_scope(sender, instance, **kwargs):
+    # После сохранения модель обновляет значение из базы, поэтому
+    # прежняя область запоминается до записи.
+    loaded = INVALIDATED_SCOPES[sender][2]
+    instance._scope_before_save = (
+        getattr(instance, loaded, None) if loaded else None
+    )
+
+
+def bump_versions(sender, instance=None, using=None, **kwargs):
+    references = None
+    if instance is not None:
+        references = {}
+        if sender in INVALIDATED_SCOPES:
+            _, attname, _ = INVALIDATED_SCOPES[sender]
+            references[attname] = {
+                getattr(instance, attname),
+                getattr(instance, '_scope_before_save', None),
+            } - {None}
+    invalidate(sender, references, using)
+
+
+def bump_user_versions(sender, instance, created=False, using=None,
+                       **kwargs):
+    """Регистрация меняет только число пользователей, а имена авторов
+    в отзывах и комментариях - смена username и удаление."""
+    deleted = kwargs['signal'] is post_delete
+    renamed = (not created and not deleted
+               and instance.loaded_username() != instance.username)
+    tables = []
+    if created or deleted:
+        tables.append(User._meta.db_table)
+    if deleted or renamed:
+        tables.append(USERNAMES_SCOPE)
+    if tables:
+        bump_after_commit(tables, using)
+
+
+def bump_title_genre_versions(sender, action, using=None, **kwargs):
+    if action.startswith('post_'):
+        bump_versions(TitleGenre, using=using)
+
+
+for model in INVALIDATED_TABLES:
+    if model is User:
+        continue
+    post_save.connect(bump_versions, sender=model)
+    post_delete.connect(bump_versions, sender=model)
+for model in INVALIDATED_SCOPES:
+    pre_save.connect(remember_scope, sender=model)
+post_save.connect(bump_user_versions, sender=User)
+post_delete.connect(bump_user_versions, sender=User)
+m2m_changed.connect(bump_title_genre_versions, sender=Title.genre.through)
+connection_created.connect(register_sqlite_functions)
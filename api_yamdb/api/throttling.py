@@ -0,0 +1,115 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+KEY = 'throttle:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60), как в настройках троттлинга DRF."""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period[0]]
+
+
+class SlidingWindowCounter:
+    """Скользящее окно из двух счётчиков фиксированных окон.
+
+    Оценка числа запросов за последние ``window`` секунд - текущий
+    счётчик плюс предыдущий, взвешенный долей окна, которая ещё не
+    вышла. Обновление - один ``add``/``incr`` и одно чтение, память -
+    два ключа на клиента, поэтому подходит любой кеш Django с атомарным
+    ``incr``: локальная память процесса, memcached или Redis.
+    """
+
+    def __init__(self, cache, limit, window):
+        self.cache = cache
+        self.limit = limit
+        self.window = window
+
+    def increment(self, key):
+        if self.cache.add(key, 1, self.window * 2):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Ключ вытеснили между add и incr.
+            self.cache.set(key, 1, self.window * 2)
+            return 1
+
+    def hit(self, ident, now=None):
+        """Учитывает запрос; возвращает (разрешён, секунд до разрешения)."""
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, self.window)
+        current = self.increment(KEY.format(ident, int(index)))
+        previous = self.cache.get(KEY.format(ident, int(index) - 1), 0)
+        remaining = 1 - elapsed / self.window
+        if previous * remaining + current <= self.limit:
+            return True, 0
+        return False, self.wait(previous, current, elapsed)
+
+    def wait(self, previous, current, elapsed):
+        if current < self.limit:
+            # Хватит того, что предыдущее окно уйдёт достаточно далеко.
+            share = 1 - (self.limit - current) / previous
+            return max(share * self.window - elapsed, 0)
+        share = 1 - (self.limit - 1) / current
+        return self.window - elapsed + share * self.window
+
+
+class AuthThrottle(BaseThrottle):
+    """Ограничение частоты запросов к эндпоинтам аутентификации.
+
+    Лимиты задаются в AUTH_THROTTLE_RATES по ключу
+    ``<view.throttle_scope>_<kind>``; отсутствующий лимит не
+    ограничивает. Отклонённые запросы тоже учитываются, поэтому
+    непрерывный перебор остаётся заблокированным. Подклассы задают
+    ``kind`` и ``get_ident_value(request)`` - значение, по которому
+    считаются запросы, или None, если запрос не ограничивается.
+    """
+
+    kind = None
+
+    def get_counter(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = settings.AUTH_THROTTLE_RATES.get(f'{scope}_{self.kind}')
+        if rate is None:
+            return None, None
+        limit, window = parse_rate(rate)
+        return scope, SlidingWindowCounter(
+            caches[settings.THROTTLE_CACHE_ALIAS], limit, window
+        )
+
+    def allow_request(self, request, view):
+        self.delay = None
+        scope, counter = self.get_counter(view)
+        value = self.get_ident_value(request) if counter else None
+        if not value:
+            return True
+        digest = hashlib.md5(value.encode()).hexdigest()
+        allowed, self.delay = counter.hit(f'{scope}:{self.kind}:{digest}')
+        return allowed
+
+    def wait(self):
+        return self.delay
+
+
+class IPThrottle(AuthThrottle):
+    kind = 'ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(AuthThrottle):
+    kind = 'username'
+
+    def get_ident_value(self, request):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str):
+            return None
+        return username.strip().lower()
@@ -1,6 +1,7 @@
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       MyTokenObtainView, ReviewViewSet, SignUpView,
-                       TitleViewSet, UserViewSet)
+from api.views import (CategoryViewSet, CommentViewSet,
+                       DatabaseConnectionsView, ExportView, GenreViewSet,
+                       MetricsView, MyTokenObtainView, ReviewViewSet,
+                       SignUpView, TitleViewSet, UserViewSet)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -35,5 +36,9 @@ auth_urls = [
 
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
-    path('v1/auth/', include(auth_urls))
+    path('v1/auth/', include(auth_urls)),
+    path('v1/export/<slug:dataset>/', ExportView.as_view(), name='export'),
+    path('v1/db/connections/', DatabaseConnectionsView.as_view(),
+         name='db_connections'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
 ]
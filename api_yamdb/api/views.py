@@ -1,53 +1,126 @@
-from api.filters import TitleFilter
-from api.mixins import CreateListDestroyViewSet
+from api.cache import bump_table_versions, scope
+from api.exports import DATASETS, OUTPUTS, parse_since
+from api.filters import (NullsLastOrderingFilter, TitleFilter,
+                         ordering_expressions)
+from api.loaders import USERNAMES_SCOPE
+from api.metrics import registry
+from api.mixins import CachedResponseMixin, CreateListDestroyViewSet
+from api.pagination import CachedCountPagination, PageNumberOrCursorPagination
+from api.parsers import NDJSONParser
 from api.permissions import (AdminOnly, AdminOrReadOnly,
                              ModeratorAdminAuthorOrReadOnly)
+from api.search import TrigramSearchFilter
 from api.serializers import (CategorySerializer, CommentSerializer,
                              GenreSerializer, MyTokenObtainSerializer,
                              ReviewSerializer, SignUpSerializer,
-                             TitlePostSerializer, TitleSerializer,
-                             UserSelfSerializer, UserSerializer)
+                             TitleBulkSerializer, TitlePostSerializer,
+                             TitleSerializer, TitleStatsSerializer,
+                             UserSelfSerializer, UserSerializer, title_stats)
+from api.throttling import IPThrottle, UsernameThrottle
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenViewBase
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.outbox import enqueue_email
+
+from api_yamdb.db.connections import connection_stats
 
 User = get_user_model()
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class TopTitlesMixin:
+    """Лучшие произведения категории или жанра: ``{slug}/top/``.
+
+    ``?by=`` - rating (по умолчанию) или reviews_count, ``?limit=`` -
+    число произведений, не больше TOP_TITLES_MAX_LIMIT. Сортировка идёт
+    по хранимым полям произведения и обслуживается индексами.
+    Произведения объекта отбираются по ``top_titles_lookup`` - пути от
+    Title к модели вьюсета.
+    """
+
+    top_orderings = ('rating', 'reviews_count')
+    top_titles_lookup = None
+
+    def get_response_cache_scopes(self):
+        scopes = super().get_response_cache_scopes()
+        if self.action == 'top':
+            scopes += [Title._meta.db_table, TitleGenre._meta.db_table]
+        return scopes
+
+    @action(detail=True, url_path='top')
+    def top(self, request, *args, **kwargs):
+        return self.cached_response(self.get_top, request, *args, **kwargs)
+
+    def get_top(self, request, *args, **kwargs):
+        by = request.query_params.get('by', 'rating')
+        if by not in self.top_orderings:
+            raise ValidationError({'by': 'Допустимые значения: '
+                                         + ', '.join(self.top_orderings)})
+        limit = request.query_params.get('limit',
+                                         str(settings.TOP_TITLES_LIMIT))
+        if (not limit.isdigit()
+                or not 0 < int(limit) <= settings.TOP_TITLES_MAX_LIMIT):
+            raise ValidationError({'limit': (
+                'Ожидается число от 1 до '
+                f'{settings.TOP_TITLES_MAX_LIMIT}'
+            )})
+        titles = Title.objects.filter(
+            **{self.top_titles_lookup: self.get_object()}
+        ).order_by(
+            *ordering_expressions(['-' + by])
+        ).prefetch_related('titlegenre_set')[:int(limit)]
+        return Response(TitleSerializer(
+            titles, many=True, context=self.get_serializer_context()
+        ).data)
+
+
+class CategoryViewSet(TopTitlesMixin, CachedResponseMixin,
+                      CreateListDestroyViewSet):
     queryset = Category.objects.all()
+    response_cache_models = (Category,)
     serializer_class = CategorySerializer
     lookup_field = 'slug'
     permission_classes = (AdminOrReadOnly,)
-    pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
+    pagination_class = CachedCountPagination
+    filter_backends = (TrigramSearchFilter,)
     search_fields = ('name', 'slug',)
+    top_titles_lookup = 'category'
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(TopTitlesMixin, CachedResponseMixin,
+                   CreateListDestroyViewSet):
     queryset = Genre.objects.all()
+    response_cache_models = (Genre,)
     serializer_class = GenreSerializer
     lookup_field = 'slug'
     permission_classes = (AdminOrReadOnly,)
-    pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
+    pagination_class = CachedCountPagination
+    filter_backends = (TrigramSearchFilter,)
     search_fields = ('name', 'slug',)
+    top_titles_lookup = 'titlegenre__genre'
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_response_cache_scopes(self):
+        return [
+            scope(Review._meta.db_table, title=self.kwargs.get('title_id')),
+            USERNAMES_SCOPE,
+        ]
 
     def get_permissions(self):
         if self.action == 'POST':
@@ -68,24 +141,109 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return title.reviews.all()
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitleViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.prefetch_related('titlegenre_set')
+    response_cache_models = (Title, Category, Genre, TitleGenre)
     serializer_class = TitleSerializer
     permission_classes = (AdminOrReadOnly,)
-    pagination_class = PageNumberPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = PageNumberOrCursorPagination
+    filter_backends = (DjangoFilterBackend, NullsLastOrderingFilter)
     filter_class = TitleFilter
+    ordering_fields = ('rating', 'reviews_count', 'year', 'name')
+
+    @property
+    def cursor_ordering(self):
+        ordering = NullsLastOrderingFilter().get_ordering(
+            self.request, self.queryset, self
+        )
+        if not ordering:
+            return ('name', 'id')
+        # Курсор сравнивает значения поля, строки с NULL он пропустит.
+        if any(Title._meta.get_field(field.lstrip('-')).null
+               for field in ordering):
+            raise ValidationError({'ordering': (
+                'С курсорной пагинацией нельзя сортировать по полям, '
+                'которые могут быть пустыми: используйте номера страниц'
+            )})
+        tiebreaker = '-id' if ordering[-1].startswith('-') else 'id'
+        return (*ordering, tiebreaker)
+
+    def with_stats(self):
+        return self.request.query_params.get('stats') in ('1', 'true')
+
+    def get_queryset(self):
+        if self.with_stats():
+            return super().get_queryset().select_related('stats')
+        return super().get_queryset()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['with_stats'] = self.with_stats()
+        return context
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return TitleSerializer
         return TitlePostSerializer
 
+    @action(detail=True, url_path='stats')
+    def stats(self, request, *args, **kwargs):
+        return self.cached_response(self.get_stats, request, *args, **kwargs)
+
+    def get_stats(self, request, *args, **kwargs):
+        title = self.get_object()
+        return Response(TitleStatsSerializer(title_stats(title)).data)
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='bulk',
+        parser_classes=(JSONParser, NDJSONParser),
+    )
+    def bulk_create(self, request):
+        if (isinstance(request.data, list)
+                and len(request.data) > settings.TITLES_BULK_MAX_ITEMS):
+            return Response(
+                {'detail': 'За один запрос можно создать не более '
+                           f'{settings.TITLES_BULK_MAX_ITEMS} произведений'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = TitleBulkSerializer(
+            data=request.data, many=True,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                errors = serializer.get_unique_errors()
+                if errors:
+                    return Response(errors,
+                                    status=status.HTTP_400_BAD_REQUEST)
+                serializer.save()
+        except IntegrityError:
+            # Такое же произведение вставил параллельный запрос после
+            # проверки get_unique_errors.
+            return Response(
+                {'non_field_errors': [serializer.unique_error_message()]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        bump_table_versions(Title._meta.db_table, TitleGenre._meta.db_table)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (ModeratorAdminAuthorOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_response_cache_scopes(self):
+        return [
+            scope(Comment._meta.db_table,
+                  review=self.kwargs.get('review_id')),
+            scope(Review._meta.db_table, title=self.kwargs.get('title_id')),
+            USERNAMES_SCOPE,
+        ]
 
     def get_review(self):
         title_id = self.kwargs.get('title_id')
@@ -104,6 +262,8 @@ class CommentViewSet(viewsets.ModelViewSet):
 
 class SignUpView(APIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request):
         s_user = User.objects.filter(
@@ -112,24 +272,76 @@ class SignUpView(APIView):
         ).first()
         serializer = SignUpSerializer(s_user, data=request.data)
         if serializer.is_valid():
-            s_user = serializer.save()
-            confirmation_code = default_token_generator.make_token(s_user)
-            send_mail(
-                'Код потверждения',
-                f'Ваш код подтверждения: {confirmation_code}',
-                settings.DEFAULT_SENDER_EMAIL,
-                [serializer.data['email']],
-            )
+            with transaction.atomic():
+                s_user = serializer.save()
+                confirmation_code = default_token_generator.make_token(
+                    s_user
+                )
+                # Письмо отправит send_outbox_emails: SMTP не задерживает
+                # ответ, а код не потеряется при откате регистрации.
+                enqueue_email(
+                    'Код потверждения',
+                    f'Ваш код подтверждения: {confirmation_code}',
+                    [serializer.data['email']],
+                )
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ExportView(APIView):
+    """Полная выгрузка набора данных в NDJSON или CSV потоком.
+
+    Строки читаются серверным курсором пачками по EXPORT_CHUNK_SIZE,
+    отзывы и комментарии упорядочены по ``pub_date`` и фильтруются
+    параметром ``since`` для инкрементальной выгрузки.
+    """
+
+    permission_classes = (AdminOnly,)
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            return Response(
+                {'detail': f'Неизвестный набор данных: {dataset}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        columns, rows, supports_since = DATASETS[dataset]
+        output = request.query_params.get('output', 'ndjson')
+        if output not in OUTPUTS:
+            return Response(
+                {'output': f'Допустимые форматы: {", ".join(OUTPUTS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        since = request.query_params.get('since')
+        if since is not None:
+            if not supports_since:
+                return Response(
+                    {'since': 'Фильтр доступен только для отзывов '
+                              'и комментариев'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            since = parse_since(since)
+            if since is None:
+                return Response(
+                    {'since': 'Ожидается дата или дата и время в '
+                              'формате ISO 8601'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        render, content_type = OUTPUTS[output]
+        response = StreamingHttpResponse(
+            render(columns, rows(since)), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output}"'
+        )
+        return response
+
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = 'username'
     permission_classes = (AdminOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
 
     @action(
         methods=['get', 'patch'],
@@ -156,4 +368,30 @@ class UserViewSet(viewsets.ModelViewSet):
 
 class MyTokenObtainView(TokenViewBase):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'token'
     serializer_class = MyTokenObtainSerializer
+
+
+class DatabaseConnectionsView(APIView):
+    """Настройки соединений с базой и статистика пула этого процесса.
+
+    У каждого воркера свой пул, поэтому ответ описывает только процесс,
+    обработавший запрос.
+    """
+
+    permission_classes = (AdminOnly,)
+
+    def get(self, request):
+        return Response(connection_stats())
+
+
+class MetricsView(APIView):
+    """Метрики запросов этого процесса в текстовом формате Prometheus."""
+
+    permission_classes = (AdminOnly,)
+
+    def get(self, request):
+        return HttpResponse(registry.render(),
+                            content_type='text/plain; version=0.0.4; '
+                                         'charset=utf-8')
@@ -1,7 +1,15 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from api.asgi import AsyncReadApplication  # noqa: E402
+
+application = AsyncReadApplication(
+    fallback=WsgiToAsgi(get_wsgi_application())
+)
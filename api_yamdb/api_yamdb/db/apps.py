@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+
+from api_yamdb.db.connections import check_connections, mark_checked
+
+
+class DbConfig(AppConfig):
+    """Проверка постоянных соединений с базой во всех профилях."""
+
+    name = 'api_yamdb.db'
+    label = 'yamdb_db'
+
+    def ready(self):
+        connection_created.connect(mark_checked)
+        request_started.connect(check_connections)
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from api_yamdb.db.pool import pools
+
+
+def mark_checked(sender, connection, **kwargs):
+    connection.health_checked_at = time.monotonic()
+
+
+def check_connections(**kwargs):
+    """Проверяет постоянные соединения потока в начале запроса.
+
+    Django 2.2 замечает разорванное соединение только после ошибки в
+    запросе, поэтому соединение, не проверявшееся дольше
+    DB_HEALTH_CHECK_INTERVAL секунд, проверяется ``SELECT 1`` и
+    закрывается, если сервер его уже не обслуживает.
+    """
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        checked_at = getattr(connection, 'health_checked_at', 0)
+        if now - checked_at < settings.DB_HEALTH_CHECK_INTERVAL:
+            continue
+        if connection.is_usable():
+            connection.health_checked_at = now
+        else:
+            connection.close()
+
+
+def connection_stats():
+    """Настройки соединений и статистика пулов процесса по алиасам."""
+    stats = {}
+    for alias in connections:
+        settings_dict = connections.databases[alias]
+        stats[alias] = {
+            'engine': settings_dict['ENGINE'],
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'health_check_interval': settings.DB_HEALTH_CHECK_INTERVAL,
+            'pool': next(
+                (pool.stats() for key, pool in pools.items()
+                 if key[0] == alias), None
+            ),
+        }
+    return stats
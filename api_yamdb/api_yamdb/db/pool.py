@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Пул соединений с базой внутри процесса.
+
+    ``connect`` открывает новое соединение, ``check`` проверяет
+    соединение, пролежавшее без дела дольше ``check_interval`` секунд,
+    перед выдачей, ``reset`` готовит возвращённое соединение к повторному
+    использованию и возвращает False, если его нужно закрыть. Одновременно
+    открыто не больше ``max_size`` соединений; свободные дольше
+    ``max_idle`` секунд закрываются, пока в пуле больше ``min_size``.
+    Если все соединения заняты, ``acquire`` ждёт до ``timeout`` секунд.
+    """
+
+    def __init__(self, connect, check=None, reset=None, min_size=0,
+                 max_size=10, timeout=5.0, max_idle=300.0,
+                 check_interval=30.0):
+        self.connect = connect
+        self.check = check
+        self.reset = reset
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+        self.condition = threading.Condition()
+        # Свободные соединения с моментом возврата, самые старые слева.
+        self.idle = deque()
+        self.in_use = 0
+        self.counters = dict.fromkeys((
+            'acquired', 'waited', 'timeouts', 'opened', 'closed',
+            'health_check_failures', 'peak_in_use',
+        ), 0)
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def acquire(self):
+        started = time.monotonic()
+        with self.condition:
+            connection, released_at = self.take(started)
+        if connection is not None and self.is_stale(released_at):
+            if self.check is not None and not self.check(connection):
+                self.count('health_check_failures')
+                self.close_connections([connection])
+                connection = None
+        if connection is None:
+            try:
+                connection = self.connect()
+            except Exception:
+                with self.condition:
+                    self.in_use -= 1
+                    self.condition.notify()
+                raise
+            self.count('opened')
+        return connection
+
+    def count(self, name, value=1):
+        with self.condition:
+            self.counters[name] += value
+
+    def take(self, started):
+        """Занимает место в пуле; вызывается под блокировкой."""
+        deadline = started + self.timeout
+        waited = False
+        while not self.idle and self.in_use >= self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.counters['timeouts'] += 1
+                self.record_wait(started)
+                raise PoolTimeoutError(
+                    f'Все {self.max_size} соединений пула заняты'
+                )
+            waited = True
+            self.condition.wait(remaining)
+        self.in_use += 1
+        self.counters['acquired'] += 1
+        self.counters['peak_in_use'] = max(self.counters['peak_in_use'],
+                                           self.in_use)
+        if waited:
+            self.record_wait(started)
+        if self.idle:
+            # Последнее возвращённое соединение, скорее всего, живо.
+            return self.idle.pop()
+        return None, None
+
+    def record_wait(self, started):
+        wait = time.monotonic() - started
+        self.counters['waited'] += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def is_stale(self, released_at):
+        return time.monotonic() - released_at >= self.check_interval
+
+    def release(self, connection, discard=False):
+        if not discard and self.reset is not None:
+            try:
+                discard = not self.reset(connection)
+            except Exception:
+                discard = True
+        with self.condition:
+            self.in_use -= 1
+            expired = self.expire_idle()
+            if discard:
+                expired.append(connection)
+            else:
+                self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+        self.close_connections(expired)
+
+    def expire_idle(self):
+        now = time.monotonic()
+        expired = []
+        while (self.idle and len(self.idle) + self.in_use > self.min_size
+               and now - self.idle[0][1] >= self.max_idle):
+            expired.append(self.idle.popleft()[0])
+        return expired
+
+    def close_connections(self, connections):
+        self.count('closed', len(connections))
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Закрывает свободные соединения, например, после fork."""
+        with self.condition:
+            connections = [connection for connection, _ in self.idle]
+            self.idle.clear()
+        self.close_connections(connections)
+
+    def stats(self):
+        with self.condition:
+            stats = dict(
+                self.counters,
+                in_use=self.in_use,
+                idle=len(self.idle),
+                size=self.in_use + len(self.idle),
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+            waited = self.counters['waited']
+            stats.update(
+                wait_ms_total=round(self.wait_total * 1000, 3),
+                wait_ms_max=round(self.wait_max * 1000, 3),
+                wait_ms_avg=round(
+                    self.wait_total * 1000 / waited if waited else 0, 3
+                ),
+            )
+        return stats
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """Пул процесса для ``key``; создаётся ``factory()`` при первом вызове."""
+    if key not in pools:
+        with pools_lock:
+            if key not in pools:
+                pools[key] = factory()
+    return pools[key]
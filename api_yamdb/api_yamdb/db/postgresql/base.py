@@ -0,0 +1,91 @@
+"""PostgreSQL с пулом соединений процесса.
+
+Включается через ``DB_ENGINE=api_yamdb.db.postgresql``; размеры пула и
+таймауты задаются в DB_POOL. Соединение берётся из пула при первом
+запросе к базе и возвращается в него по окончании HTTP-запроса, а не
+держится потоком CONN_MAX_AGE секунд.
+"""
+from django.conf import settings
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from api_yamdb.db.pool import ConnectionPool, get_pool
+
+Database = base.Database
+
+
+def connect(conn_params, options):
+    connection = Database.connect(**conn_params)
+    isolation_level = options.get('isolation_level')
+    if (isolation_level is not None
+            and isolation_level != connection.isolation_level):
+        connection.set_session(isolation_level=isolation_level)
+    return connection
+
+
+def check(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+def reset(connection):
+    """Откатывает незавершённую транзакцию перед возвратом в пул."""
+    if connection.closed:
+        return False
+    status = connection.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_IDLE:
+        return True
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    connection.rollback()
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        key = (self.alias, self.settings_dict['NAME'])
+        return get_pool(key, self.make_pool)
+
+    def make_pool(self):
+        conn_params = self.get_connection_params()
+        options = self.settings_dict['OPTIONS']
+        return ConnectionPool(
+            lambda: connect(conn_params, options),
+            check=check,
+            reset=reset,
+            min_size=settings.DB_POOL['MIN_SIZE'],
+            max_size=settings.DB_POOL['MAX_SIZE'],
+            timeout=settings.DB_POOL['TIMEOUT'],
+            max_idle=settings.DB_POOL['MAX_IDLE'],
+            check_interval=settings.DB_HEALTH_CHECK_INTERVAL,
+        )
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.acquire()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.in_atomic_block:
+            # Django оставит ссылку на соединение до выхода из atomic,
+            # поэтому в пул его отдавать нельзя.
+            self.pool.release(self.connection, discard=True)
+        else:
+            self.pool.release(self.connection)
+
+    def close_if_unusable_or_obsolete(self):
+        # Вызывается в начале и в конце HTTP-запроса: вне транзакции
+        # соединение возвращается в пул независимо от CONN_MAX_AGE.
+        super().close_if_unusable_or_obsolete()
+        if self.connection is not None and not self.in_atomic_block:
+            self.close()
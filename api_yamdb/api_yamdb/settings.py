@@ -1,31 +1,59 @@
 import os
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'test_secret')
 
-DEBUG = False
+# Профиль развёртывания: какие приложения и middleware загружает
+# воркер. api - только JWT API без админки, сессий, CSRF и
+# браузерного API DRF; admin - API и админка; dev - admin с DEBUG и
+# debug_toolbar.
+PROFILE = os.getenv('DJANGO_PROFILE', default='admin')
+if PROFILE not in ('api', 'admin', 'dev'):
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль DJANGO_PROFILE: {PROFILE}'
+    )
+
+DEBUG = PROFILE == 'dev'
 
 ALLOWED_HOSTS = ['*']
 
-INSTALLED_APPS = [
+ADMIN_APPS = [
     'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+]
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
     'rest_framework_simplejwt',
-    'debug_toolbar',
+    'api_yamdb.db.apps.DbConfig',
     'reviews.apps.ReviewsConfig',
     'users.apps.UsersConfig',
     'api.apps.ApiConfig',
 ]
+if PROFILE != 'api':
+    INSTALLED_APPS = ADMIN_APPS + INSTALLED_APPS
+if PROFILE == 'dev':
+    INSTALLED_APPS.append('debug_toolbar')
 
+# Сессии, CSRF, аутентификация по сессии и сообщения нужны только
+# админке: API аутентифицирует запросы по JWT в DRF.
+ADMIN_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
 MIDDLEWARE = [
+    'api.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -33,8 +61,11 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
+if PROFILE == 'api':
+    MIDDLEWARE = [name for name in MIDDLEWARE if name not in ADMIN_MIDDLEWARE]
+if PROFILE == 'dev':
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
 
 INTERNAL_IPS = [
     '127.0.0.1',
@@ -68,9 +99,58 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
     }
 }
+# Постоянное соединение, не проверявшееся дольше стольких секунд,
+# проверяется SELECT 1 в начале запроса; так же проверяются соединения,
+# пролежавшие в пуле.
+DB_HEALTH_CHECK_INTERVAL = float(
+    os.getenv('DB_HEALTH_CHECK_INTERVAL', default=30)
+)
+# Пул соединений процесса для DB_ENGINE=api_yamdb.db.postgresql.
+# Соединение занято на время HTTP-запроса, поэтому MAX_SIZE не меньше
+# числа потоков воркера (для ASGI - ASYNC_ORM_THREADS, в них идут все
+# запросы), а в сумме по воркерам - меньше max_connections PostgreSQL.
+DB_POOL = {
+    'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', default=0)),
+    'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+    'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+    'MAX_IDLE': float(os.getenv('DB_POOL_MAX_IDLE', default=300)),
+}
+
+# Кеш default хранит версии таблиц (API_CACHE_ALIAS), по которым
+# сбрасываются кеш ответов, счётчики пагинации и справочники жанров и
+# категорий, а также счётчики троттлинга. Воркеры и manage.py видят
+# записи друг друга, только если это общий кеш (memcached, Redis,
+# DatabaseCache); docker-compose поднимает для него memcached.
+# LocMemCache по умолчанию годится для одного процесса и тестов.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='api_yamdb'),
+    },
+    'responses': {
+        'BACKEND': os.getenv(
+            'RESPONSE_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION',
+                              default='api_yamdb_responses'),
+    },
+}
+
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', default='default')
+RESPONSE_CACHE_ALIAS = os.getenv('RESPONSE_CACHE_ALIAS', default='responses')
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', default=600))
+# Предельный возраст копии справочников жанров и категорий в памяти
+# воркера: страховка на случай, если версия таблицы в кеше не
+# сдвинулась (локальный кеш, вытеснение ключа).
+CATALOG_SNAPSHOT_TTL = float(os.getenv('CATALOG_SNAPSHOT_TTL', default=60))
 
 AUTH_USER_MODEL = 'users.User'
 
@@ -116,18 +196,72 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': ('rest_framework.pagination.'
                                  'PageNumberPagination'),
     'PAGE_SIZE': 5,
+    # Число прокси перед приложением, добавляющих адрес клиента в
+    # X-Forwarded-For: по нему троттлинг определяет IP клиента. 0 -
+    # заголовок не читается (REMOTE_ADDR), за nginx из docker-compose -
+    # 1. Больше реального числа прокси - клиент подделает свой адрес.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
 }
+if PROFILE == 'api':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'rest_framework.renderers.JSONRenderer',
+    ]
+
+# Размер и предел ?limit= для списков лучших произведений жанра и
+# категории (/genres/{slug}/top/, /categories/{slug}/top/).
+TOP_TITLES_LIMIT = int(os.getenv('TOP_TITLES_LIMIT', default=10))
+TOP_TITLES_MAX_LIMIT = int(os.getenv('TOP_TITLES_MAX_LIMIT', default=100))
+TITLES_BULK_MAX_ITEMS = int(os.getenv('TITLES_BULK_MAX_ITEMS', default=5000))
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
+PAGINATION_COUNT_CACHE_TTL = int(
+    os.getenv('PAGINATION_COUNT_CACHE_TTL', default=60)
+)
+PAGINATION_ESTIMATE_THRESHOLD = int(
+    os.getenv('PAGINATION_ESTIMATE_THRESHOLD', default=100000)
+)
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_SENDER_EMAIL = 'from@api_yamdb.ru'
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', default=100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', default=5))
+OUTBOX_BACKOFF = int(os.getenv('OUTBOX_BACKOFF', default=60))
+OUTBOX_MAX_BACKOFF = int(os.getenv('OUTBOX_MAX_BACKOFF', default=3600))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', default=5))
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+# Сколько секунд воркер доверяет закешированной версии токенов
+# пользователя. С общим кешем (CACHE_BACKEND) отзыв виден сразу, с
+# локальным - в других процессах не позже чем через это время.
+TOKEN_VERSION_CACHE_TTL = int(
+    os.getenv('TOKEN_VERSION_CACHE_TTL', default=300)
+)
+
+# Запросы дольше стольких секунд пишутся в журнал api.middleware с
+# SLOW_REQUEST_STATEMENTS самыми долгими SQL-выражениями.
+SLOW_REQUEST_THRESHOLD = float(
+    os.getenv('SLOW_REQUEST_THRESHOLD', default=1.0)
+)
+SLOW_REQUEST_STATEMENTS = int(os.getenv('SLOW_REQUEST_STATEMENTS', default=5))
+
+# Потоки ASGI-воркера для синхронного кода (api/asgi.py): горячих
+# чтений и запросов, переданных WSGI-приложению. У каждого потока своё
+# соединение с базой, так что воркер держит не больше стольких.
+ASYNC_ORM_THREADS = int(os.getenv('ASYNC_ORM_THREADS', default=8))
+
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', default='default')
+AUTH_THROTTLE_RATES = {
+    'signup_ip': os.getenv('SIGNUP_IP_RATE', default='20/hour'),
+    'signup_username': os.getenv('SIGNUP_USERNAME_RATE', default='5/hour'),
+    'token_ip': os.getenv('TOKEN_IP_RATE', default='30/min'),
+    'token_username': os.getenv('TOKEN_USERNAME_RATE', default='10/min'),
+}
@@ -1,10 +1,8 @@
-from django.conf import settings
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 from django.views.generic import TemplateView
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('api.urls', namespace='api')),
     path(
         'redoc/',
@@ -13,6 +11,12 @@ urlpatterns = [
     ),
 ]
 
-if settings.DEBUG:
+# Админка и debug_toolbar подключаются, только если профиль
+# (DJANGO_PROFILE) их устанавливает.
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if apps.is_installed('debug_toolbar'):
     import debug_toolbar
     urlpatterns += (path("__debug__/", include(debug_toolbar.urls)),)
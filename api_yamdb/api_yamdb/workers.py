@@ -0,0 +1,27 @@
+import socket
+
+from uvicorn.protocols.http.h11_impl import H11Protocol
+from uvicorn.workers import UvicornH11Worker
+
+
+class NoDelayH11Protocol(H11Protocol):
+    """H11Protocol с TCP_NODELAY на принятых соединениях.
+
+    asyncio включает TCP_NODELAY только для сокетов с proto=IPPROTO_TCP,
+    а сокеты gunicorn и uvicorn создаются с proto=0. Заголовки и тело
+    ответа ASGI уходят отдельными записями, и без NODELAY тело ждёт
+    отложенного ACK клиента - около 40 мс на каждый keep-alive запрос.
+    """
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info('socket')
+        if sock is not None and sock.family in (socket.AF_INET,
+                                                socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().connection_made(transport)
+
+
+class AsgiWorker(UvicornH11Worker):
+    """Воркер gunicorn для api_yamdb.asgi."""
+
+    CONFIG_KWARGS = {'loop': 'asyncio', 'http': NoDelayH11Protocol}
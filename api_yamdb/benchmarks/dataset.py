@@ -0,0 +1,103 @@
+"""Детерминированный синтетический набор данных для бенчмарков.
+
+Одинаковые параметры и ``seed`` дают одинаковые строки: имена, годы,
+жанры, оценки и авторы выбираются одним генератором случайных чисел.
+Модели заполняются ``bulk_create`` без сигналов, поэтому рейтинги
+пересчитываются, а версии таблиц кеша сдвигаются в конце. Модели
+импортируются в ``generate``: параметры по умолчанию нужны до
+``django.setup()``.
+"""
+import random
+
+DEFAULTS = {
+    'seed': 0,
+    'users': 50,
+    'categories': 5,
+    'genres': 10,
+    'titles': 200,
+    'genres_per_title': 2,
+    'reviews_per_title': 10,
+    'comments_per_review': 2,
+}
+WORDS = ('северный', 'ветер', 'тихий', 'дом', 'последний', 'город',
+         'красный', 'сад', 'долгая', 'дорога', 'старый', 'мост')
+
+
+def text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def ids(model):
+    return list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+
+def generate(batch_size=500, **options):
+    """Заполняет пустую базу; возвращает параметры и число строк."""
+    from api.signals import invalidate
+    from django.db import transaction
+    from reviews.models import (Category, Comment, Genre, Review, Title,
+                                TitleGenre)
+    from reviews.ratings import recalculate_ratings
+    from users.models import User
+    spec = dict(DEFAULTS, **options)
+    if spec['reviews_per_title'] > spec['users']:
+        raise ValueError('Отзывов на произведение не может быть больше, '
+                         'чем пользователей: один отзыв на автора')
+    rng = random.Random(spec['seed'])
+    with transaction.atomic():
+        User.objects.bulk_create(
+            (User(username=f'user{number:05d}',
+                  email=f'user{number:05d}@yamdb.ru')
+             for number in range(spec['users'])),
+            batch_size=batch_size,
+        )
+        Category.objects.bulk_create(
+            (Category(name=f'Категория {number}', slug=f'category-{number}')
+             for number in range(spec['categories'])),
+            batch_size=batch_size,
+        )
+        Genre.objects.bulk_create(
+            (Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+             for number in range(spec['genres'])),
+            batch_size=batch_size,
+        )
+        user_ids, category_ids, genre_ids = (
+            ids(User), ids(Category), ids(Genre)
+        )
+        Title.objects.bulk_create(
+            (Title(name=f'{text(rng, 2)} {number}',
+                   year=rng.randint(1900, 2022),
+                   description=text(rng, 8),
+                   category_id=rng.choice(category_ids))
+             for number in range(spec['titles'])),
+            batch_size=batch_size,
+        )
+        title_ids = ids(Title)
+        genres_per_title = min(spec['genres_per_title'], len(genre_ids))
+        TitleGenre.objects.bulk_create(
+            (TitleGenre(title_id=title_id, genre_id=genre_id)
+             for title_id in title_ids
+             for genre_id in rng.sample(genre_ids, genres_per_title)),
+            batch_size=batch_size,
+        )
+        Review.objects.bulk_create(
+            (Review(title_id=title_id, author_id=author_id,
+                    text=text(rng, 12), score=rng.randint(1, 10))
+             for title_id in title_ids
+             for author_id in rng.sample(user_ids,
+                                         spec['reviews_per_title'])),
+            batch_size=batch_size,
+        )
+        Comment.objects.bulk_create(
+            (Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                     text=text(rng, 6))
+             for review_id in ids(Review)
+             for _ in range(spec['comments_per_review'])),
+            batch_size=batch_size,
+        )
+        recalculate_ratings()
+    models = (User, Category, Genre, Title, TitleGenre, Review, Comment)
+    for model in models:
+        invalidate(model)
+    return dict(spec, rows={model._meta.db_table: model.objects.count()
+                            for model in models})
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            body += await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, body
+
+
+class Client:
+    """Минимальный HTTP/1.1-клиент с keep-alive для нагрузочных тестов."""
+
+    def __init__(self, base_url, headers=None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = ''.join(f'{name}: {value}\r\n'
+                               for name, value in (headers or {}).items())
+        self.reader = self.writer = None
+
+    async def request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        self.writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+            f'{self.headers}\r\n'.encode('latin1')
+        )
+        await self.writer.drain()
+        status, headers, body = await read_response(self.reader)
+        if headers.get('connection') == 'close':
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def run_load(base_url, paths, concurrency, duration, headers=None):
+    """Гоняет ``concurrency`` клиентов по кругу путей ``duration`` секунд.
+
+    Возвращает словарь с числом запросов, ошибок, RPS и перцентилями
+    задержки в миллисекундах.
+    """
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        client = Client(base_url, headers)
+        step = offset
+        while time.perf_counter() < deadline:
+            path = paths[step % len(paths)]
+            step += 1
+            started = time.perf_counter()
+            try:
+                status, _ = await client.request(path)
+            except (OSError, asyncio.IncompleteReadError, ValueError,
+                    IndexError):
+                errors += 1
+                client.close()
+                continue
+            if status >= 500:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+        client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) or 0, 2),
+        'p95_ms': round(percentile(latencies, 0.95) or 0, 2),
+        'p99_ms': round(percentile(latencies, 0.99) or 0, 2),
+    }
@@ -0,0 +1,142 @@
+"""Время запуска воркера и накладные расходы на запрос по профилям.
+
+Запуск из каталога api_yamdb:
+
+    python -m benchmarks.profiles --profiles api admin --repeat 5
+
+Для каждого профиля (DJANGO_PROFILE) в отдельных процессах измеряется
+время ``django.setup()`` с загрузкой WSGI-приложения и URLconf, число
+загруженных модулей, пиковая память и время обработки анонимного
+запроса к корню API: он проходит все middleware и аутентификацию DRF,
+получает 401 и не обращается к базе, поэтому разница между профилями -
+это стоимость приложений и middleware.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.http import percentile
+
+PROFILES = ('api', 'admin', 'dev')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES,
+                        default=list(PROFILES))
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Сколько процессов запускать на профиль')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Запросов на процесс для замера накладных '
+                             'расходов')
+    parser.add_argument('--json', action='store_true',
+                        help='Вывести результаты в JSON')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def measure(requests):
+    """Замер внутри процесса с уже выставленным DJANGO_PROFILE."""
+    import resource
+
+    started = time.perf_counter()
+    import django
+    django.setup(set_prefix=False)
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+    application = get_wsgi_application()
+    get_resolver().url_patterns
+    setup = time.perf_counter() - started
+    # Каждый ответ 401 иначе попадёт в журнал django.request.
+    logging.disable(logging.WARNING)
+
+    def request():
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api/v1/',
+            'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80', 'HTTP_ACCEPT': 'application/json',
+            'wsgi.url_scheme': 'http', 'wsgi.input': sys.stdin.buffer,
+            'wsgi.errors': sys.stderr,
+        }
+        response = application(environ, lambda status, headers: None)
+        for _ in response:
+            pass
+        response.close()
+
+    started = time.perf_counter()
+    request()
+    first = time.perf_counter() - started
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        request()
+        timings.append(time.perf_counter() - started)
+    return {
+        'setup_ms': setup * 1000,
+        'first_request_ms': first * 1000,
+        'request_us': [timing * 1e6 for timing in timings],
+        'modules': len(sys.modules),
+        'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_child(profile, requests):
+    env = dict(os.environ, DJANGO_PROFILE=profile,
+               DJANGO_SETTINGS_MODULE='api_yamdb.settings')
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.profiles', '--child',
+         '--requests', str(requests)],
+        env=env, stdout=subprocess.PIPE, check=True,
+    ).stdout
+    result = json.loads(output)
+    result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def summarize(profile, runs):
+    timings = [timing for run in runs for timing in run['request_us']]
+    return {
+        'profile': profile,
+        'process_ms': round(statistics.median(
+            run['process_ms'] for run in runs), 1),
+        'setup_ms': round(statistics.median(
+            run['setup_ms'] for run in runs), 1),
+        'first_ms': round(statistics.median(
+            run['first_request_ms'] for run in runs), 1),
+        'modules': runs[0]['modules'],
+        'maxrss_kb': max(run['maxrss_kb'] for run in runs),
+        'p50_us': round(percentile(timings, 0.5), 1),
+        'p95_us': round(percentile(timings, 0.95), 1),
+        'p99_us': round(percentile(timings, 0.99), 1),
+    }
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        json.dump(measure(args.requests), sys.stdout)
+        return
+    results = []
+    for profile in args.profiles:
+        runs = [run_child(profile, args.requests)
+                for _ in range(args.repeat)]
+        results.append(summarize(profile, runs))
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    columns = tuple(results[0])
+    print(' '.join(f'{column:>10}' for column in columns))
+    for result in results:
+        print(' '.join(f'{result[column]!s:>10}' for column in columns))
+
+
+if __name__ == '__main__':
+    main()
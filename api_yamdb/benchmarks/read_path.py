@@ -0,0 +1,147 @@
+"""Сравнение синхронного и асинхронного (ASGI) пути чтения.
+
+Запуск из каталога api_yamdb:
+
+    python -m benchmarks.read_path --serve --workers 2 -c 1 16 64
+
+С ``--serve`` скрипт сам поднимает на соседних портах gunicorn с
+api_yamdb.wsgi и gunicorn с воркерами api_yamdb.workers.AsgiWorker для
+api_yamdb.asgi с одинаковым числом воркеров; без него нагружает уже
+запущенные серверы по ``--sync-url`` и ``--async-url``.
+``--no-response-cache`` отключает кеш ответов, чтобы каждый запрос
+доходил до базы.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from benchmarks.http import Client, run_load
+
+SERVERS = {
+    'sync': ['gunicorn', 'api_yamdb.wsgi:application', '--bind',
+             '127.0.0.1:{port}', '--workers', '{workers}'],
+    'async': ['gunicorn', 'api_yamdb.asgi:application', '--worker-class',
+              'api_yamdb.workers.AsgiWorker', '--bind',
+              '127.0.0.1:{port}', '--workers', '{workers}'],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--serve', action='store_true',
+                        help='Запустить оба сервера самостоятельно')
+    parser.add_argument('--port', type=int, default=8100,
+                        help='Порт синхронного сервера, асинхронный - +1')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--sync-url', default='http://127.0.0.1:8100')
+    parser.add_argument('--async-url', default='http://127.0.0.1:8101')
+    parser.add_argument('-c', '--concurrency', type=int, nargs='+',
+                        default=[1, 16, 64])
+    parser.add_argument('-d', '--duration', type=float, default=10)
+    parser.add_argument('--titles', type=int, default=20,
+                        help='Сколько произведений включить в набор путей')
+    parser.add_argument('--no-response-cache', action='store_true')
+    parser.add_argument('--json', action='store_true',
+                        help='Вывести результаты в JSON')
+    return parser.parse_args()
+
+
+@contextmanager
+def servers(args):
+    if not args.serve:
+        yield {'sync': args.sync_url, 'async': args.async_url}
+        return
+    env = dict(os.environ)
+    if args.no_response_cache:
+        env['RESPONSE_CACHE_BACKEND'] = (
+            'django.core.cache.backends.dummy.DummyCache'
+        )
+    processes, urls = [], {}
+    try:
+        for offset, (name, command) in enumerate(SERVERS.items()):
+            port = args.port + offset
+            with socket.socket() as probe:
+                if probe.connect_ex(('127.0.0.1', port)) == 0:
+                    raise RuntimeError(f'порт {port} для {name} уже занят')
+            # Скрипт сервера ищется рядом с текущим интерпретатором.
+            executable = os.path.join(os.path.dirname(sys.executable),
+                                      command[0])
+            processes.append(subprocess.Popen(
+                [executable] + [part.format(port=port, workers=args.workers)
+                                for part in command[1:]],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+            urls[name] = f'http://127.0.0.1:{port}'
+        for url in urls.values():
+            asyncio.run(wait_until_up(url))
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+async def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        client = Client(url)
+        try:
+            await client.request('/api/v1/')
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+        finally:
+            client.close()
+
+
+async def discover_paths(url, count):
+    client = Client(url)
+    paths = ['/api/v1/titles/']
+    next_path = '/api/v1/titles/?paginator=cursor'
+    title_ids = []
+    while next_path and len(title_ids) < count:
+        _, body = await client.request(next_path)
+        page = json.loads(body)
+        title_ids += [title['id'] for title in page['results']]
+        next_path = page['next'] and '?'.join(urlsplit(page['next'])[2:4])
+    client.close()
+    for title_id in title_ids[:count]:
+        paths += [f'/api/v1/titles/{title_id}/',
+                  f'/api/v1/titles/{title_id}/reviews/']
+    return paths
+
+
+def main():
+    args = parse_args()
+    results = []
+    with servers(args) as urls:
+        paths = asyncio.run(discover_paths(urls['sync'], args.titles))
+        for concurrency in args.concurrency:
+            for name, url in urls.items():
+                result = asyncio.run(
+                    run_load(url, paths, concurrency, args.duration)
+                )
+                results.append(dict(server=name, concurrency=concurrency,
+                                    **result))
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    columns = ('server', 'concurrency', 'requests', 'errors', 'rps',
+               'p50_ms', 'p95_ms', 'p99_ms')
+    print(' '.join(f'{column:>11}' for column in columns))
+    for result in results:
+        print(' '.join(f'{result[column]!s:>11}' for column in columns))
+
+
+if __name__ == '__main__':
+    main()
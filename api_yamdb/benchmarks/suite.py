@@ -0,0 +1,247 @@
+"""Сценарии к вьюхам DRF через тестовый клиент на синтетических данных.
+
+Запуск из каталога api_yamdb:
+
+    python -m benchmarks.suite --titles 500 --output release.json
+    python -m benchmarks.suite --titles 500 --baseline release.json
+
+Создаётся тестовая база (как у ``manage.py test``, настройки базы
+берутся из окружения), заполняется benchmarks.dataset, и каждый
+сценарий выполняется ``--iterations`` раз. Для сценария сохраняются
+перцентили задержки и число запросов к базе; JSON с отсортированными
+ключами удобно сравнивать между релизами, ``--baseline`` печатает
+изменения относительно сохранённого прогона.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from benchmarks.http import percentile
+
+DUMMY_CACHE = 'django.core.cache.backends.dummy.DummyCache'
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'queries_p50', 'queries_max')
+
+
+def titles_list(client, data, rng):
+    filters = ((), ('page',), ('genre',), ('category',), ('year',),
+               ('name',), ('genre', 'year'))
+    while True:
+        params = {name: rng.choice(data['filters'][name])
+                  for name in rng.choice(filters)}
+        yield lambda: client.get('/api/v1/titles/', params)
+
+
+def reviews_page(client, data, rng):
+    while True:
+        title_id = rng.choice(data['title_ids'])
+        page = rng.randint(1, data['review_pages'])
+        yield lambda: client.get(f'/api/v1/titles/{title_id}/reviews/',
+                                 {'page': page})
+
+
+def comments_page(client, data, rng):
+    while True:
+        title_id, review_id = rng.choice(data['review_ids'])
+        yield lambda: client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        )
+
+
+def signup_token(client, data, rng):
+    """Регистрация и получение токена; шаги измеряются раздельно."""
+    from django.contrib.auth.tokens import default_token_generator
+    from users.models import User
+    number = 0
+    while True:
+        username = f'bench{number:06d}'
+        number += 1
+        yield 'signup', lambda: client.post('/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@yamdb.ru',
+        })
+        code = default_token_generator.make_token(
+            User.objects.get(username=username)
+        )
+        yield 'token', lambda: client.post('/api/v1/auth/token/', {
+            'username': username, 'confirmation_code': code,
+        })
+
+
+SCENARIOS = {
+    'titles_list': titles_list,
+    'reviews_page': reviews_page,
+    'comments_page': comments_page,
+    'signup_token': signup_token,
+}
+
+
+def parse_args():
+    from benchmarks.dataset import DEFAULTS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, default in DEFAULTS.items():
+        parser.add_argument('--' + name.replace('_', '-'), type=int,
+                            default=default)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS,
+                        default=list(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--no-response-cache', action='store_true',
+                        help='Отключить кеш ответов')
+    parser.add_argument('--keepdb', action='store_true',
+                        help='Не удалять тестовую базу после прогона')
+    parser.add_argument('--output', help='Файл для JSON с результатами')
+    parser.add_argument('--baseline', help='JSON прошлого прогона')
+    return parser.parse_args()
+
+
+def scenario_data(spec):
+    from reviews.models import Review, Title
+
+    reviews = Review.objects.order_by('pk').values_list('title_id', 'pk')
+    return {
+        'title_ids': list(Title.objects.order_by('pk')
+                          .values_list('pk', flat=True)),
+        'review_ids': list(reviews),
+        'review_pages': max(1, -(-spec['reviews_per_title'] // 5)),
+        'filters': {
+            'page': range(1, max(1, spec['titles'] // 5) + 1),
+            'genre': [f'genre-{number}'
+                      for number in range(spec['genres'])],
+            'category': [f'category-{number}'
+                         for number in range(spec['categories'])],
+            'year': sorted(set(Title.objects.values_list('year',
+                                                         flat=True))),
+            'name': [str(number) for number in range(spec['titles'])],
+        },
+    }
+
+
+def measure(request):
+    from api.middleware import QueryRecorder
+    from django.db import connection
+
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        started = time.perf_counter()
+        response = request()
+        elapsed = time.perf_counter() - started
+    return response.status_code, elapsed * 1000, recorder.count
+
+
+def steps(scenario):
+    for step in scenario:
+        yield step if isinstance(step, tuple) else (None, step)
+
+
+def run_scenario(name, data, iterations, warmup, seed):
+    from rest_framework.test import APIClient
+
+    samples = {}
+    scenario = steps(SCENARIOS[name](APIClient(), data, random.Random(seed)))
+    for index in range(warmup + iterations):
+        step, request = next(scenario)
+        key = f'{name}.{step}' if step else name
+        if step == 'signup':
+            # Токен запрашивается следующим шагом того же цикла.
+            measured = measure(request), measure(next(scenario)[1])
+            keys = key, f'{name}.token'
+        else:
+            measured, keys = (measure(request),), (key,)
+        if index < warmup:
+            continue
+        for key, sample in zip(keys, measured):
+            samples.setdefault(key, []).append(sample)
+    return {key: summarize(values) for key, values in samples.items()}
+
+
+def summarize(samples):
+    statuses, timings, queries = zip(*samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(status >= 400 for status in statuses),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'queries_p50': percentile(queries, 0.50),
+        'queries_max': max(queries),
+    }
+
+
+def run(spec, scenarios, iterations, warmup):
+    from benchmarks.dataset import generate
+    from django import get_version
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    dataset = generate(**spec)
+    data = scenario_data(dataset)
+    results = {}
+    # Лимиты частоты не должны отклонять регистрации бенчмарка.
+    with override_settings(AUTH_THROTTLE_RATES={}):
+        for name in scenarios:
+            results.update(run_scenario(name, data, iterations, warmup,
+                                        spec['seed']))
+    return {
+        'dataset': dataset,
+        'environment': {
+            'python': platform.python_version(),
+            'django': get_version(),
+            'database': connection.vendor,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline):
+    header = ''.join(f'{metric:>22}' for metric in METRICS)
+    print(f'{"scenario":<22}{header}')
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name, {})
+        cells = []
+        for metric in METRICS:
+            old = previous.get(metric)
+            change = (f'{(current[metric] - old) / old:+.0%}'
+                      if old else 'n/a')
+            cells.append(f'{old} -> {current[metric]} {change}')
+        print(f'{name:<22}' + ''.join(f'{cell:>22}' for cell in cells))
+
+
+def main():
+    args = parse_args()
+    if args.no_response_cache:
+        os.environ['RESPONSE_CACHE_BACKEND'] = DUMMY_CACHE
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup(set_prefix=False)
+    from benchmarks.dataset import DEFAULTS
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    spec = {name: getattr(args, name) for name in DEFAULTS}
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0,
+                                                  keepdb=args.keepdb)
+    try:
+        results = run(spec, args.scenarios, args.iterations, args.warmup)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0,
+                                            keepdb=args.keepdb)
+        teardown_test_environment()
+    output = json.dumps(results, indent=2, sort_keys=True) + '\n'
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(results, json.load(file))
+    elif not args.output:
+        sys.stdout.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,7 @@ class GenreAdmin(admin.ModelAdmin):
 
 class TitleAdmin(admin.ModelAdmin):
     inlines = (TitleGenreInline,)
+    readonly_fields = ('rating', 'reviews_count', 'score_sum')
 
 
 admin.site.register(Category)
@@ -0,0 +1,544 @@
+import csv
+import hashlib
+import logging
+import multiprocessing
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.utils import timezone
+from reviews.models import ImportedRow
+
+logger = logging.getLogger(__name__)
+
+
+def read_batches(path, batch_size):
+    """Читает csv-файл пачками строк, не загружая его целиком."""
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile, delimiter=',')
+        headers = next(reader)
+        batch = []
+        for row in reader:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield headers, batch
+                batch = []
+        if batch:
+            yield headers, batch
+
+
+def resolve_columns(model, headers):
+    """Поля модели по заголовкам csv: ``author`` и ``author_id`` -> FK."""
+    return [model._meta.get_field(header) for header in headers]
+
+
+def to_python(field, value):
+    if value == '' and field.null:
+        return None
+    if field.is_relation:
+        return field.target_field.to_python(value)
+    return field.to_python(value)
+
+
+class Progress:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.monotonic()
+        self.loaded = 0
+        self.skipped = 0
+
+    def update(self, loaded, skipped=0):
+        self.loaded += loaded
+        self.skipped += skipped
+        elapsed = time.monotonic() - self.started
+        logger.info(
+            f'{self.name}: загружено {self.loaded}, пропущено '
+            f'{self.skipped}, {self.loaded / max(elapsed, 1e-6):.0f} строк/с'
+        )
+
+
+def check_references(fields, rows):
+    """Индексы строк с внешними ключами на несуществующие объекты.
+
+    На каждую пачку и каждый внешний ключ уходит один запрос.
+    """
+    broken = set()
+    for position, field in enumerate(fields):
+        if not field.is_relation:
+            continue
+        values = {row[position] for row in rows
+                  if row[position] is not None}
+        existing = set(
+            field.related_model._default_manager.filter(
+                pk__in=values
+            ).values_list('pk', flat=True)
+        )
+        broken.update(
+            index for index, row in enumerate(rows)
+            if row[position] is not None and row[position] not in existing
+        )
+    return broken
+
+
+def reset_sequence(model, connection):
+    """Выравнивает последовательность первичного ключа после вставки
+    строк с явными id (PostgreSQL; на других СУБД запросов нет)."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+            cursor.execute(sql)
+
+
+def load_orm(model, path, batch_size):
+    """Потоковая загрузка csv через bulk_create пачками.
+
+    Внешние ключи присваиваются по id, без выборки связанных объектов.
+    """
+    progress = Progress(model._meta.db_table)
+    fields = None
+    for headers, batch in read_batches(path, batch_size):
+        fields = fields or resolve_columns(model, headers)
+        rows = [
+            [to_python(field, value) for field, value in zip(fields, row)]
+            for row in batch
+        ]
+        broken = check_references(fields, rows)
+        for index in sorted(broken):
+            logger.warning(
+                f'{model._meta.db_table}: пропущена строка {rows[index]} - '
+                'ссылка на несуществующий объект'
+            )
+        model.objects.bulk_create(
+            model(**{field.attname: value
+                     for field, value in zip(fields, row)})
+            for index, row in enumerate(rows) if index not in broken
+        )
+        progress.update(len(rows) - len(broken), len(broken))
+    reset_sequence(model, connections[router.db_for_write(model)])
+    return progress
+
+
+def missing_column_values(model, fields, connection):
+    """Значения для обязательных колонок, которых нет в csv."""
+    present = {field.column for field in fields}
+    missing = []
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.column in present:
+            continue
+        if getattr(field, 'auto_now', False) or getattr(
+                field, 'auto_now_add', False):
+            value = timezone.now()
+        else:
+            value = field.get_default()
+        if value is not None:
+            missing.append(
+                (field, field.get_db_prep_save(value, connection))
+            )
+    return missing
+
+
+def load_copy(model, path, batch_size):
+    """Загрузка csv через COPY FROM STDIN и промежуточную таблицу.
+
+    Строки копируются во временную таблицу без ограничений, строки со
+    ссылками на несуществующие объекты удаляются из неё запросом на
+    каждый внешний ключ, остальные переносятся одним INSERT ... SELECT.
+    После загрузки последовательность первичного ключа выравнивается.
+    На других СУБД используется загрузка через ORM.
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.vendor != 'postgresql':
+        logger.warning(f'COPY поддерживается только PostgreSQL, '
+                       f'{model._meta.db_table} загружается через ORM')
+        return load_orm(model, path, batch_size)
+    progress = Progress(model._meta.db_table)
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        headers = next(csv.reader([csvfile.readline()]))
+        fields = resolve_columns(model, headers)
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                loaded, skipped = copy_through_stage(
+                    cursor, connection, model, fields, csvfile
+                )
+            reset_sequence(model, connection)
+    progress.update(loaded, skipped)
+    return progress
+
+
+def copy_through_stage(cursor, connection, model, fields, csvfile):
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    stage = quote(f'{table}_stage')
+    columns = ', '.join(quote(field.column) for field in fields)
+    cursor.execute(
+        f'CREATE TEMP TABLE {stage} ON COMMIT DROP AS '
+        f'SELECT {columns} FROM {quote(table)} WITH NO DATA'
+    )
+    cursor.copy_expert(
+        f'COPY {stage} ({columns}) FROM STDIN WITH (FORMAT csv)', csvfile
+    )
+    staged = cursor.rowcount
+    skipped = 0
+    for field in fields:
+        if not field.is_relation:
+            continue
+        related = field.related_model._meta
+        cursor.execute(
+            f'DELETE FROM {stage} s WHERE s.{quote(field.column)} IS NOT '
+            f'NULL AND NOT EXISTS (SELECT 1 FROM {quote(related.db_table)} '
+            f'r WHERE r.{quote(related.pk.column)} = '
+            f's.{quote(field.column)})'
+        )
+        if cursor.rowcount:
+            logger.warning(f'{table}: пропущено строк со ссылкой на '
+                           f'несуществующий {related.db_table} - '
+                           f'{cursor.rowcount}')
+        skipped += cursor.rowcount
+    # Пустые ячейки csv COPY читает как NULL, а текстовые поля Django
+    # хранят пустую строку.
+    selected, params = [], []
+    for field in fields:
+        if not field.null and field.empty_strings_allowed:
+            selected.append(f'COALESCE({quote(field.column)}, '
+                            f'CAST(%s AS {field.db_type(connection)}))')
+            params.append('')
+        else:
+            selected.append(quote(field.column))
+    missing = missing_column_values(model, fields, connection)
+    for field, value in missing:
+        selected.append(f'CAST(%s AS {field.db_type(connection)})')
+        params.append(value)
+    target = ', '.join(quote(field.column) for field in fields) + ''.join(
+        f', {quote(field.column)}' for field, _ in missing
+    )
+    cursor.execute(
+        f'INSERT INTO {quote(table)} ({target}) SELECT '
+        f'{", ".join(selected)} FROM {stage} ON CONFLICT DO NOTHING',
+        params
+    )
+    loaded = cursor.rowcount
+    if staged - skipped > loaded:
+        logger.warning(f'{table}: пропущено строк с конфликтом уникальных '
+                       f'значений - {staged - skipped - loaded}')
+    return loaded, staged - loaded
+
+
+def row_digest(headers, row):
+    return hashlib.sha1(
+        '\x1f'.join(headers + ['\x1e'] + row).encode('utf-8')
+    ).hexdigest()
+
+
+def upsert(connection, model, columns, rows, conflict, update):
+    """INSERT ... ON CONFLICT DO UPDATE (PostgreSQL и SQLite 3.24+)."""
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    max_params = connection.features.max_query_params or 65535
+    chunk_size = max(1, max_params // len(columns))
+    placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    assignments = ', '.join(
+        f'{quote(column)} = EXCLUDED.{quote(column)}' for column in update
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            cursor.execute(
+                f'INSERT INTO {quote(model._meta.db_table)} '
+                f'({", ".join(quote(column) for column in columns)}) '
+                f'VALUES {", ".join([placeholder] * len(chunk))} '
+                f'ON CONFLICT ({", ".join(quote(c) for c in conflict)}) '
+                f'DO UPDATE SET {assignments}',
+                [value for row in chunk for value in row]
+            )
+
+
+SyncResult = namedtuple(
+    'SyncResult', ('seen', 'written', 'references', 'tracked')
+)
+
+
+def sync_file(model, path, batch_size, track=()):
+    """Применяет только изменившиеся строки csv.
+
+    Хеш каждой строки сравнивается с сохранённым в ImportedRow; новые
+    и изменённые строки записываются upsert-ом по первичному ключу,
+    совпавшие пропускаются. Возвращает первичные ключи всех строк
+    файла (для последующего удаления исчезнувших), число записанных
+    строк, значения их внешних ключей по attname - прежние и новые,
+    и первичные ключи записанных строк, которые вставлены заново или
+    у которых изменилось одно из полей ``track``.
+    """
+    connection = connections[router.db_for_write(model)]
+    table = model._meta.db_table
+    pk = model._meta.pk
+    progress = Progress(table)
+    fields = seen = None
+    written = 0
+    references = defaultdict(set)
+    tracked = set()
+    for headers, batch in read_batches(path, batch_size):
+        if fields is None:
+            fields = resolve_columns(model, headers)
+            if pk not in fields:
+                raise ValueError(f'{table}: в csv нет колонки {pk.name}')
+            position = fields.index(pk)
+            missing = missing_column_values(model, fields, connection)
+            relations = [(index, field) for index, field in enumerate(fields)
+                         if field.is_relation]
+            watched = [(index, field) for index, field in enumerate(fields)
+                       if field.attname in track]
+            seen = set()
+        rows = [
+            [to_python(field, value) for field, value in zip(fields, row)]
+            for row in batch
+        ]
+        digests = [row_digest(headers, row) for row in batch]
+        keys = [row[position] for row in rows]
+        seen.update(keys)
+        stored = dict(ImportedRow.objects.filter(
+            table=table, object_id__in=keys
+        ).values_list('object_id', 'digest'))
+        # Строки, удалённые каскадом или вручную, загружаются заново.
+        existing = {row[0]: row[1:] for row in model.objects.filter(
+            pk__in=keys
+        ).values_list('pk', *(
+            field.attname for _, field in relations + watched
+        ))}
+        changed = [index for index, key in enumerate(keys)
+                   if key not in existing
+                   or stored.get(key) != digests[index]]
+        broken = check_references(fields, [rows[i] for i in changed])
+        changed = [index for number, index in enumerate(changed)
+                   if number not in broken]
+        for number, (column, field) in enumerate(relations):
+            for index in changed:
+                references[field.attname].add(rows[index][column])
+                if keys[index] in existing:
+                    references[field.attname].add(
+                        existing[keys[index]][number]
+                    )
+        tracked.update(
+            keys[index] for index in changed
+            if keys[index] not in existing
+            or existing[keys[index]][len(relations):] != tuple(
+                rows[index][column] for column, _ in watched
+            )
+        )
+        with transaction.atomic(using=connection.alias):
+            upsert(
+                connection, model,
+                [field.column for field in fields]
+                + [field.column for field, _ in missing],
+                [[field.get_db_prep_save(value, connection)
+                  for field, value in zip(fields, rows[index])]
+                 + [value for _, value in missing]
+                 for index in changed],
+                [pk.column],
+                [field.column for field in fields if field is not pk],
+            )
+            upsert(
+                connection, ImportedRow,
+                ['table', 'object_id', 'digest'],
+                [[table, keys[index], digests[index]] for index in changed],
+                ['table', 'object_id'],
+                ['digest'],
+            )
+        written += len(changed)
+        progress.update(len(changed), len(rows) - len(changed))
+    if written:
+        reset_sequence(model, connection)
+    return SyncResult(seen or set(), written, dict(references), tracked)
+
+
+def delete_missing(model, seen, batch_size):
+    """Удаляет импортированные ранее строки, которых нет в новом csv."""
+    table = model._meta.db_table
+    imported = ImportedRow.objects.filter(table=table)
+    stale = [object_id for object_id in imported.values_list(
+        'object_id', flat=True
+    ).iterator() if object_id not in seen]
+    for start in range(0, len(stale), batch_size):
+        chunk = stale[start:start + batch_size]
+        with transaction.atomic():
+            model.objects.filter(pk__in=chunk).delete()
+            imported.filter(object_id__in=chunk).delete()
+    if stale:
+        logger.info(f'{table}: удалено строк - {len(stale)}')
+
+
+ENGINES = {
+    'orm': load_orm,
+    'copy': load_copy,
+}
+
+
+def dependency_levels(models):
+    """Разбивает модели на уровни по внешним ключам между ними.
+
+    Модели одного уровня не ссылаются друг на друга и могут
+    загружаться одновременно; каждый уровень зависит только от
+    предыдущих.
+    """
+    pending = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    levels = []
+    while pending:
+        ready = [model for model in models
+                 if model in pending and not pending[model]]
+        if not ready:
+            raise ValueError(
+                'Циклическая зависимость между таблицами: '
+                + ', '.join(model._meta.db_table for model in pending)
+            )
+        levels.append(ready)
+        for model in ready:
+            del pending[model]
+        for dependencies in pending.values():
+            dependencies.difference_update(ready)
+    return levels
+
+
+def referencing_models(models):
+    """Модели и все модели, ссылающиеся на них по цепочке внешних ключей.
+
+    Учитываются и автоматические промежуточные таблицы ManyToManyField.
+    """
+    result = list(models)
+    pending = list(models)
+    candidates = apps.get_models(include_auto_created=True)
+    while pending:
+        target = pending.pop()
+        for model in candidates:
+            if model in result:
+                continue
+            if any(field.is_relation and field.related_model is target
+                   for field in model._meta.concrete_fields):
+                result.append(model)
+                pending.append(model)
+    return result
+
+
+def truncate_tables(models, using=DEFAULT_DB_ALIAS):
+    """Очищает таблицы моделей и ссылающихся на них моделей.
+
+    В отличие от ``QuerySet.delete()`` строки не загружаются в память и
+    сигналы удаления не посылаются: пересчёт рейтингов и сброс версий
+    кеша выполняет вызывающий код один раз после загрузки. На
+    PostgreSQL - один TRUNCATE ... CASCADE, на других СУБД - DELETE
+    по таблицам от зависимых к главным.
+    """
+    connection = connections[using]
+    models = referencing_models(models)
+    if connection.vendor == 'postgresql':
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute('TRUNCATE ' + ', '.join(
+                quote(model._meta.db_table) for model in models
+            ) + ' CASCADE')
+        return
+    with transaction.atomic(using=using):
+        for level in reversed(dependency_levels(models)):
+            for model in level:
+                model._base_manager.using(using).all()._raw_delete(using)
+
+
+@contextmanager
+def deferred_constraints(models, using=DEFAULT_DB_ALIAS):
+    """Снимает на время загрузки индексы и внешние ключи таблиц.
+
+    Индексы, на которых держатся первичные ключи и ограничения
+    уникальности, остаются: на них опирается ON CONFLICT. Остальные
+    индексы и внешние ключи создаются заново по сохранённым
+    определениям после загрузки. Работает только на PostgreSQL.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.conrelid::regclass::text, c.conname, '
+            'pg_get_constraintdef(c.oid) FROM pg_constraint c '
+            'WHERE c.contype = %s AND c.conrelid::regclass::text = ANY(%s)',
+            ['f', tables]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            'SELECT i.indexname, i.indexdef FROM pg_indexes i '
+            'WHERE i.schemaname = current_schema() '
+            'AND i.tablename = ANY(%s) AND NOT EXISTS ('
+            'SELECT 1 FROM pg_constraint c WHERE c.conindid = ('
+            "quote_ident(i.schemaname) || '.' || quote_ident(i.indexname)"
+            ')::regclass)',
+            [tables]
+        )
+        indexes = cursor.fetchall()
+        quote = connection.ops.quote_name
+        for table, name, _ in foreign_keys:
+            cursor.execute(
+                f'ALTER TABLE {table} DROP CONSTRAINT {quote(name)}'
+            )
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {quote(name)}')
+    logger.info(f'сняты индексы ({len(indexes)}) и внешние ключи '
+                f'({len(foreign_keys)}) на время загрузки')
+    try:
+        yield
+    finally:
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            for _, definition in indexes:
+                cursor.execute(definition)
+            for table, name, definition in foreign_keys:
+                cursor.execute(
+                    f'ALTER TABLE {table} ADD CONSTRAINT {quote(name)} '
+                    f'{definition}'
+                )
+        logger.info('индексы и внешние ключи восстановлены за '
+                    f'{time.monotonic() - started:.1f} с')
+
+
+def load_file(model_label, path, engine, batch_size):
+    """Загрузка одного файла в отдельном процессе."""
+    model = apps.get_model(model_label)
+    progress = ENGINES[engine](model, path, batch_size)
+    connections.close_all()
+    return model_label, progress.loaded, progress.skipped
+
+
+def load_parallel(files, engine, batch_size, jobs):
+    """Загружает файлы по уровням зависимостей в пуле процессов.
+
+    ``files`` - словарь модель -> путь к csv. Таблицы одного уровня
+    загружаются одновременно, каждая в своём процессе со своим
+    соединением с базой.
+    """
+    # Соединения закрываются до форка, чтобы процессы пула открыли
+    # собственные, а не разделяли сокет родителя.
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        for level in dependency_levels(list(files)):
+            logger.info('параллельная загрузка: ' + ', '.join(
+                model._meta.db_table for model in level
+            ))
+            futures = [
+                pool.submit(load_file, model._meta.label, files[model],
+                            engine, batch_size)
+                for model in level
+            ]
+            for future in futures:
+                label, loaded, skipped = future.result()
+                logger.info(f'{label}: загружено {loaded}, '
+                            f'пропущено {skipped}')
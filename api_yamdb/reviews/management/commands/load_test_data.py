@@ -1,13 +1,20 @@
-import csv
 import logging
 import os
 import sys
 from collections import OrderedDict
 
+from api.signals import invalidate
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from django.db import transaction
+from django.db.models import Max
+from reviews.loaders import (ENGINES, deferred_constraints, delete_missing,
+                             load_parallel, sync_file, truncate_tables)
+from reviews.models import (Category, Comment, Genre, ImportedRow, Review,
+                            Title, TitleGenre)
+from reviews.ratings import recalculate_ratings
 from users.models import User
+from users.tokens import bump_token_versions
 
 CSV_MODELS = OrderedDict([
     ('users.csv', User),
@@ -19,29 +26,15 @@ CSV_MODELS = OrderedDict([
     ('comments.csv', Comment),
 ])
 
-FK = {
-    'titles.csv': {'category': Category},
-    'review.csv': {
-        'author': User,
-        'title': Title,
-    },
-    'genre_title': {
-        'title': Title,
-        'genre': Genre,
-    },
-    'comments.csv': {
-        'review': Review,
-        'author': User}
-}
-
 formatter = logging.Formatter(
     '%(asctime)s [%(levelname)s] %(message)s'
 )
 handler = logging.StreamHandler(stream=sys.stdout)
 handler.setFormatter(formatter)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(handler)
+for logger_name in (__name__, 'reviews.loaders'):
+    logging.getLogger(logger_name).setLevel(logging.INFO)
+    logging.getLogger(logger_name).addHandler(handler)
 
 
 class Command(BaseCommand):
@@ -61,35 +54,130 @@ class Command(BaseCommand):
             action='store_false',
             help='Не удалять текущие данные перед заливкой новых',
         )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=1000,
+            help='Количество строк csv в одной пачке',
+        )
+        parser.add_argument(
+            '--engine',
+            choices=tuple(ENGINES),
+            default='orm',
+            help='Способ загрузки: orm - bulk_create пачками, '
+                 'copy - COPY FROM STDIN (только PostgreSQL)',
+        )
+        parser.add_argument(
+            '-j',
+            '--jobs',
+            type=int,
+            default=1,
+            help='Количество процессов для параллельной загрузки '
+                 'независимых таблиц',
+        )
+        parser.add_argument(
+            '--defer_constraints',
+            action='store_true',
+            help='Снять индексы и внешние ключи на время загрузки и '
+                 'создать их заново после (только PostgreSQL)',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Инкрементальная загрузка: записать только новые и '
+                 'изменённые строки, удалить исчезнувшие из csv',
+        )
 
     def handle(self, *args, **options):
         csv_path = options['csv_path']
         logger.info(f'директория с csv-файлами - {csv_path}')
-        files = [f for f in os.listdir(csv_path)
-                 if os.path.isfile(os.path.join(csv_path, f))
-                 and f in CSV_MODELS]
+        files = OrderedDict()
         for file, model in CSV_MODELS.items():
-            if file not in files:
+            path = os.path.join(csv_path, file)
+            if not os.path.isfile(path):
                 logger.warning(f'отсутствует заявленный файл - {file}')
                 continue
-            if options['no_delete']:
-                model.objects.all().delete()
-            logger.info(f'обработка файла - {file}')
-            with open(
-                os.path.join(csv_path, file),
-                newline='',
-                encoding='utf-8'
-            ) as csvfile:
-                observes = []
-                data = csv.reader(csvfile, delimiter=',')
-                headers = next(data)
-                for row in data:
-                    observe = dict(zip(headers, row))
-                    if file in FK:
-                        for header, value in zip(headers, row):
-                            if header in FK[file]:
-                                observe[header] = (
-                                    FK[file][header].objects.get(pk=value)
-                                )
-                    observes.append(model(**observe))
-                model.objects.bulk_create(observes)
+            files[model] = path
+        if options['sync']:
+            self.sync(files, options['batch_size'])
+            return
+        token_floor = self.token_floor(files)
+        if options['no_delete']:
+            truncate_tables(files)
+        # Полная заливка не ведёт хеши строк: следующая
+        # инкрементальная загрузка перезапишет таблицы целиком.
+        ImportedRow.objects.filter(table__in=[
+            model._meta.db_table for model in files
+        ]).delete()
+        if options['defer_constraints']:
+            with deferred_constraints(files):
+                self.load(files, options)
+        else:
+            self.load(files, options)
+        if User in files:
+            # Строки пользователей вставлены заново с версией токенов по
+            # умолчанию: выданные до заливки токены отзываются.
+            bump_token_versions(User.objects.all(), token_floor)
+        logger.info('пересчёт рейтингов произведений')
+        recalculate_ratings()
+        for model in CSV_MODELS.values():
+            invalidate(model)
+
+    def sync(self, files, batch_size):
+        """Сверка с csv; пересчёт и сброс кеша - только по изменениям.
+
+        Удаление исчезнувших строк идёт через ORM, и их счётчики и
+        версии обновляют сигналы. Записанные upsert-ом строки сигналов
+        не посылают: рейтинги пересчитываются у произведений, отзывы
+        которых записаны (прежних и новых), версии сдвигаются у
+        таблиц с записанными строками, токены отзываются у вставленных
+        пользователей и у сменивших имя, роль или статус.
+        """
+        token_floor = self.token_floor(files)
+        results = OrderedDict()
+        for model, path in files.items():
+            logger.info(f'сверка файла - {os.path.basename(path)}')
+            results[model] = sync_file(
+                model, path, batch_size,
+                track=User.TOKEN_CLAIM_FIELDS if model is User else (),
+            )
+        for model in reversed(results):
+            delete_missing(model, results[model].seen, batch_size)
+        written = OrderedDict(
+            (model, result) for model, result in results.items()
+            if result.written
+        )
+        if User in written and written[User].tracked:
+            bump_token_versions(
+                User.objects.filter(pk__in=written[User].tracked),
+                token_floor,
+            )
+        if Review in written:
+            title_ids = written[Review].references.get('title_id', set())
+            logger.info('пересчёт рейтингов произведений с изменёнными '
+                        f'отзывами - {len(title_ids)}')
+            with transaction.atomic():
+                recalculate_ratings(Title.objects.filter(pk__in=title_ids))
+        for model, result in written.items():
+            invalidate(model, result.references)
+
+    def token_floor(self, files):
+        """Наибольшая версия токенов до загрузки пользователей.
+
+        Строки, вставленные заново, получают версию выше неё: токены
+        удалённых прежде пользователей с теми же id не оживают.
+        """
+        if User not in files:
+            return 0
+        return User.objects.aggregate(
+            floor=Max('token_version')
+        )['floor'] or 0
+
+    def load(self, files, options):
+        if options['jobs'] > 1:
+            load_parallel(files, options['engine'], options['batch_size'],
+                          options['jobs'])
+            return
+        for model, path in files.items():
+            logger.info(f'обработка файла - {os.path.basename(path)}')
+            ENGINES[options['engine']](model, path, options['batch_size'])
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.ratings import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитать рейтинг и счётчики отзывов всех произведений'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_ratings()
+        self.stdout.write(f'пересчитано произведений: {updated}')
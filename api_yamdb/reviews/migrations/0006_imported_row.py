@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_titlegenre_genre_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedRow',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64, verbose_name='таблица')),
+                ('object_id', models.BigIntegerField(verbose_name='первичный ключ')),
+                ('digest', models.CharField(max_length=40, verbose_name='хеш строки csv')),
+            ],
+            options={
+                'verbose_name': 'импортированная строка',
+                'verbose_name_plural': 'импортированные строки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importedrow',
+            constraint=models.UniqueConstraint(fields=('table', 'object_id'), name='unique_imported_row'),
+        ),
+    ]
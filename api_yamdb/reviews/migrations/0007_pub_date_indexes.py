@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_imported_row'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['pub_date', 'id'], name='comment_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['pub_date', 'id'], name='review_pub_date_idx'),
+        ),
+    ]
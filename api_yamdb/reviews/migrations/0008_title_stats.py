@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:04
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    rows = Review.objects.order_by().values('title_id').annotate(
+        reviews_count=Count('pk'),
+        **{f'score_{score}': Count('pk', filter=Q(score=score))
+           for score in range(1, 11)}
+    )
+    TitleStats.objects.bulk_create(TitleStats(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title', verbose_name='произведение')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'статистика отзывов',
+                'verbose_name_plural': 'статистика отзывов',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:07
+
+from django.db import migrations, models
+
+# Рейтинг по убыванию с NULL в конце: ORM строит ORDER BY "rating" DESC
+# NULLS LAST, обычный индекс по rating обслуживает только NULLS FIRST.
+RATING_INDEXES = (
+    ('title_rating_desc_idx', '(rating DESC NULLS LAST, id DESC)'),
+    ('title_category_rating_idx',
+     '(category_id, rating DESC NULLS LAST, id DESC)'),
+)
+
+
+def create_rating_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, columns in RATING_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON reviews_title {columns}'
+        )
+
+
+def drop_rating_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in RATING_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_stats'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ('name', 'id'), 'verbose_name': 'произведение', 'verbose_name_plural': 'произведения'},
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['reviews_count', 'id'], name='title_reviews_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-reviews_count', '-id'], name='title_category_reviews_idx'),
+        ),
+        migrations.RunPython(create_rating_indexes, drop_rating_indexes),
+    ]
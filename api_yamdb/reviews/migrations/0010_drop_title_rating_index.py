@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 User = get_user_model()
 
@@ -54,20 +54,103 @@ class Title(models.Model):
                                  related_name='titles',
                                  verbose_name='категории'
                                  )
+    rating = models.FloatField(null=True,
+                               blank=True,
+                               editable=False,
+                               verbose_name='Рейтинг')
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов'
+    )
+    score_sum = models.PositiveIntegerField(default=0,
+                                            editable=False,
+                                            verbose_name='Сумма оценок')
 
     class Meta:
         verbose_name = "произведение"
         verbose_name_plural = "произведения"
-        ordering = ('name', 'category')
+        ordering = ('name', 'id')
         constraints = [models.UniqueConstraint(
             fields=['name', 'category'],
             name='unique_name_category',
         )]
+        # Сортировки ?ordering= и списки лучших произведений; индексы
+        # рейтинга по убыванию с NULL в конце создаёт миграция 0009 -
+        # в Index Django 2.2 нельзя указать NULLS LAST.
+        indexes = [models.Index(fields=['name', 'id'],
+                                name='title_name_id_idx'),
+                   models.Index(fields=['rating', 'id'],
+                                name='title_rating_id_idx'),
+                   models.Index(fields=['reviews_count', 'id'],
+                                name='title_reviews_count_id_idx'),
+                   models.Index(fields=['year', 'id'],
+                                name='title_year_id_idx'),
+                   models.Index(fields=['category', '-reviews_count', '-id'],
+                                name='title_category_reviews_idx')]
 
     def __str__(self):
         return self.name
 
 
+SCORES = range(1, 11)
+
+
+class TitleStats(models.Model):
+    """Распределение оценок и число отзывов произведения.
+
+    Строка появляется с первым отзывом; её отсутствие означает, что
+    отзывов нет. Поля обновляются сигналами отзывов, целиком
+    пересчитываются в reviews.ratings.recalculate_ratings.
+    """
+
+    title = models.OneToOneField(Title,
+                                 on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name='stats',
+                                 verbose_name='произведение')
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+    score_1 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 1')
+    score_2 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 2')
+    score_3 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 3')
+    score_4 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 4')
+    score_5 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 5')
+    score_6 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 6')
+    score_7 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 7')
+    score_8 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 8')
+    score_9 = models.PositiveIntegerField(default=0,
+                                          verbose_name='Оценок 9')
+    score_10 = models.PositiveIntegerField(default=0,
+                                           verbose_name='Оценок 10')
+
+    class Meta:
+        verbose_name = "статистика отзывов"
+        verbose_name_plural = "статистика отзывов"
+
+    def __str__(self):
+        return f'{self.title_id}: {self.reviews_count}'
+
+    @staticmethod
+    def score_field(score):
+        return f'score_{score}'
+
+    @property
+    def scores(self):
+        return {score: getattr(self, self.score_field(score))
+                for score in SCORES}
+
+
 class TitleGenre(models.Model):
     title = models.ForeignKey(Title,
                               on_delete=models.CASCADE,
@@ -83,6 +166,8 @@ class TitleGenre(models.Model):
             fields=['title', 'genre'],
             name='unique_title_genre',
         )]
+        indexes = [models.Index(fields=['genre', 'title'],
+                                name='titlegenre_genre_title_idx')]
 
     def __str__(self):
         return f'{self.title.name} - {self.genre}'
@@ -113,10 +198,30 @@ class Review(models.Model):
         verbose_name_plural = "отзывы"
         ordering = ('-pub_date',)
         unique_together = ('title', 'author')
+        indexes = [models.Index(fields=['title', '-pub_date', '-id'],
+                                name='review_title_pub_date_idx'),
+                   models.Index(fields=['pub_date', 'id'],
+                                name='review_pub_date_idx')]
 
     def __str__(self):
         return f'{self.title} - {self.author.username}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rated_state()
+        return instance
+
+    def remember_rated_state(self):
+        # Значения, с которыми отзыв был загружен из базы: по ним при
+        # сохранении считается поправка к рейтингу произведения.
+        self._rated_title_id = self.__dict__.get('title_id')
+        self._rated_score = self.__dict__.get('score')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -139,7 +244,29 @@ class Comment(models.Model):
         verbose_name = "комментарий"
         verbose_name_plural = "комментарии"
         ordering = ('-pub_date',)
+        indexes = [models.Index(fields=['review', '-pub_date', '-id'],
+                                name='comment_review_pub_date_idx'),
+                   models.Index(fields=['pub_date', 'id'],
+                                name='comment_pub_date_idx')]
 
     def __str__(self):
         return (f'{self.review.title} - {self.author.username} - '
                 f'{self.text[:15]}')
+
+
+class ImportedRow(models.Model):
+    table = models.CharField(max_length=64, verbose_name='таблица')
+    object_id = models.BigIntegerField(verbose_name='первичный ключ')
+    digest = models.CharField(max_length=40,
+                              verbose_name='хеш строки csv')
+
+    class Meta:
+        verbose_name = "импортированная строка"
+        verbose_name_plural = "импортированные строки"
+        constraints = [models.UniqueConstraint(
+            fields=['table', 'object_id'],
+            name='unique_imported_row',
+        )]
+
+    def __str__(self):
+        return f'{self.table} - {self.object_id}'
@@ -0,0 +1,90 @@
+from django.db import IntegrityError, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from reviews.models import SCORES, Review, Title, TitleStats
+
+
+def apply_review_delta(title_id, count_delta, score_delta):
+    """Сдвигает счётчики произведения на изменение одного отзыва.
+
+    Обновление выполняется одним UPDATE: в SET используются значения
+    строки до обновления, поэтому гонки между отзывами не теряют данных.
+    """
+    reviews_count = F('reviews_count') + count_delta
+    score_sum = F('score_sum') + score_delta
+    Title.objects.filter(pk=title_id).update(
+        reviews_count=reviews_count,
+        score_sum=score_sum,
+        rating=Case(
+            When(reviews_count__gt=-count_delta,
+                 then=Cast(score_sum, FloatField()) / reviews_count),
+            default=Value(None),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def recalculate_ratings(queryset=None):
+    """Пересчитывает рейтинг и счётчики отзывов по таблице отзывов."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    rebuild_title_stats(queryset)
+    return queryset.update(
+        reviews_count=Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value')),
+            0
+        ),
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum('score')).values('value')),
+            0
+        ),
+        rating=Subquery(
+            reviews.annotate(value=Avg('score')).values('value'),
+            output_field=FloatField()
+        ),
+    )
+
+
+def rebuild_title_stats(queryset):
+    """Строит распределение оценок произведений по таблице отзывов."""
+    TitleStats.objects.filter(title__in=queryset).delete()
+    rows = Review.objects.filter(title__in=queryset).order_by().values(
+        'title_id'
+    ).annotate(reviews_count=Count('pk'), **{
+        TitleStats.score_field(score): Count('pk', filter=Q(score=score))
+        for score in SCORES
+    })
+    TitleStats.objects.bulk_create(TitleStats(**row) for row in rows)
+
+
+def apply_stats_delta(title_id, changes):
+    """Сдвигает распределение оценок; ``changes`` - {оценка: изменение}.
+
+    Как и apply_review_delta, обновляет строку одним UPDATE. Если
+    строки ещё нет, она строится по отзывам: сигнал приходит после
+    записи отзыва, так что изменение в ней уже учтено.
+    """
+    updates = {
+        TitleStats.score_field(score): F(TitleStats.score_field(score)) + delta
+        for score, delta in changes.items() if delta
+    }
+    if not updates:
+        return
+    count_delta = sum(changes.values())
+    if count_delta:
+        updates['reviews_count'] = F('reviews_count') + count_delta
+    if (TitleStats.objects.filter(title_id=title_id).update(**updates)
+            or count_delta < 0):
+        # Без строки отзывов у произведения не было, так что удалять
+        # нечего; так же завершается каскадное удаление произведения.
+        return
+    try:
+        with transaction.atomic():
+            rebuild_title_stats(Title.objects.filter(pk=title_id))
+    except IntegrityError:
+        # Строку одновременно создал другой отзыв, не видя этого.
+        TitleStats.objects.filter(title_id=title_id).update(**updates)
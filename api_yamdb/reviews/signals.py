@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Review, Title
+from reviews.ratings import (apply_review_delta, apply_stats_delta,
+                             recalculate_ratings)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, **kwargs):
+    rated_title_id = getattr(instance, '_rated_title_id', None)
+    if created:
+        apply_review_delta(instance.title_id, 1, instance.score)
+        apply_stats_delta(instance.title_id, {instance.score: 1})
+    elif rated_title_id is None:
+        recalculate_ratings(Title.objects.filter(pk=instance.title_id))
+    elif rated_title_id != instance.title_id:
+        apply_review_delta(rated_title_id,
+                           -1, -instance._rated_score)
+        apply_stats_delta(rated_title_id, {instance._rated_score: -1})
+        apply_review_delta(instance.title_id, 1, instance.score)
+        apply_stats_delta(instance.title_id, {instance.score: 1})
+    elif instance._rated_score != instance.score:
+        apply_review_delta(instance.title_id,
+                           0, instance.score - instance._rated_score)
+        apply_stats_delta(instance.title_id,
+                          {instance._rated_score: -1, instance.score: 1})
+    instance.remember_rated_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    apply_review_delta(instance.title_id, -1, -instance.score)
+    apply_stats_delta(instance.title_id, {instance.score: -1})
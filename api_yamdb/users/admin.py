@@ -1,5 +1,12 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 admin.site.register(User)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправить письма из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение',
+        )
+        parser.add_argument(
+            '--max_attempts',
+            type=int,
+            default=settings.OUTBOX_MAX_ATTEMPTS,
+            help='Количество попыток отправки одного письма',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=settings.OUTBOX_BACKOFF,
+            help='Задержка перед второй попыткой в секундах, далее '
+                 'удваивается',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help='Пауза между проверками очереди в секундах',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить готовые письма и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = deliver_pending(
+                    options['batch_size'], options['max_attempts'],
+                    options['backoff'],
+                )
+            except Exception as error:
+                if options['once']:
+                    raise
+                self.stderr.write(f'ошибка отправки очереди: {error}')
+                connection.close()
+            else:
+                if sent or failed or options['once']:
+                    self.stdout.write(
+                        f'отправлено писем: {sent}, ошибок: {failed}'
+                    )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -24,8 +25,79 @@ class User(AbstractUser):
         choices=ROLES,
         default='user',
     )
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токенов',
+        default=0,
+        editable=False,
+    )
+
+    TOKEN_CLAIM_FIELDS = ('username', 'role', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_token_claims()
+        return instance
+
+    def remember_token_claims(self):
+        # Значения, попавшие в выданные токены: их смена отзывает токены.
+        self._token_claims = tuple(
+            self.__dict__.get(field) for field in self.TOKEN_CLAIM_FIELDS
+        )
+
+    def loaded_username(self):
+        """username на момент загрузки из базы или прошлого сохранения."""
+        claims = getattr(self, '_token_claims', None)
+        if claims is None:
+            return None
+        return claims[self.TOKEN_CLAIM_FIELDS.index('username')]
+
+    def token_claims_changed(self):
+        claims = getattr(self, '_token_claims', None)
+        return claims is not None and claims != tuple(
+            getattr(self, field) for field in self.TOKEN_CLAIM_FIELDS
+        )
 
     def save(self, *args, **kwargs):
         if self.is_superuser:
             self.role = 'admin'
+        if self.token_claims_changed():
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = (
+                    set(kwargs['update_fields']) | {'token_version'}
+                )
         super(User, self).save(*args, **kwargs)
+        self.remember_token_claims()
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку фоновым воркером."""
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Дата создания')
+    send_after = models.DateTimeField(default=timezone.now,
+                                      verbose_name='Отправить не раньше')
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки',
+    )
+    last_error = models.TextField(blank=True,
+                                  verbose_name='Последняя ошибка')
+    sent_at = models.DateTimeField(null=True, blank=True,
+                                   verbose_name='Дата отправки')
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'исходящие письма'
+        ordering = ('send_after', 'id')
+        indexes = [models.Index(fields=['send_after', 'id'],
+                                name='outgoing_email_pending_idx',
+                                condition=models.Q(sent_at__isnull=True))]
+
+    def __str__(self):
+        return f'{self.recipient} - {self.subject}'
@@ -0,0 +1,87 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    """Ставит письмо в очередь; вызывать в транзакции с изменениями."""
+    return OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(
+            subject=subject,
+            body=body,
+            from_email=from_email or settings.DEFAULT_SENDER_EMAIL,
+            recipient=recipient,
+        )
+        for recipient in recipients
+    ])
+
+
+def retry_delay(attempts, backoff):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return min(backoff * 2 ** (attempts - 1), settings.OUTBOX_MAX_BACKOFF)
+
+
+def pending_emails(max_attempts):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=timezone.now(),
+        attempts__lt=max_attempts,
+    )
+
+
+def deliver_batch(batch_size, max_attempts, backoff):
+    """Отправляет одну пачку писем через общее SMTP-соединение.
+
+    Строки блокируются с SKIP LOCKED, поэтому несколько воркеров не
+    отправят одно письмо дважды. Неудачная попытка откладывает письмо
+    с экспоненциальной задержкой; после max_attempts оно остаётся в
+    таблице неотправленным. Возвращает (отправлено, ошибок).
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        emails = list(pending_emails(max_attempts).select_for_update(
+            skip_locked=True
+        )[:batch_size])
+        if not emails:
+            return sent, failed
+        with get_connection() as connection:
+            for email in emails:
+                email.attempts += 1
+                try:
+                    EmailMessage(
+                        email.subject, email.body, email.from_email,
+                        [email.recipient], connection=connection,
+                    ).send()
+                except Exception as error:
+                    logger.warning(f'письмо {email.pk} не отправлено '
+                                   f'(попытка {email.attempts}): {error}')
+                    email.last_error = str(error)
+                    email.send_after = timezone.now() + timedelta(
+                        seconds=retry_delay(email.attempts, backoff)
+                    )
+                    failed += 1
+                else:
+                    email.sent_at = timezone.now()
+                    sent += 1
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'last_error', 'send_after', 'sent_at')
+        )
+    return sent, failed
+
+
+def deliver_pending(batch_size, max_attempts, backoff):
+    """Отправляет пачками всё, что готово к отправке."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_batch(batch_size, max_attempts, backoff)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import User
+from users.tokens import REVOKED, set_token_version
+
+# Версия пишется в кеш сразу, а не после коммита: при откате
+# транзакции токены лишь будут отклоняться до истечения записи, а
+# отозванный токен не успеет пройти проверку.
+
+
+@receiver(post_save, sender=User)
+def publish_token_version(sender, instance, **kwargs):
+    set_token_version(
+        instance.pk, instance.token_version if instance.is_active else REVOKED
+    )
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens(sender, instance, **kwargs):
+    set_token_version(instance.pk, REVOKED)
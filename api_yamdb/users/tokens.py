@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models import Value
+from django.db.models.functions import Greatest
+
+TOKEN_VERSION_KEY = 'user_token_version:{}'
+REVOKED = -1
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_token_version(user_id):
+    """Действующая версия токенов пользователя.
+
+    Берётся из кеша, при промахе - одним запросом из базы. Для
+    удалённых и неактивных пользователей возвращает REVOKED.
+    """
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = get_cache().get(key)
+    if version is None:
+        row = get_user_model().objects.filter(pk=user_id).values_list(
+            'token_version', 'is_active'
+        ).first()
+        version = row[0] if row is not None and row[1] else REVOKED
+        get_cache().set(key, version, settings.TOKEN_VERSION_CACHE_TTL)
+    return version
+
+
+def set_token_version(user_id, version):
+    get_cache().set(TOKEN_VERSION_KEY.format(user_id), version,
+                    settings.TOKEN_VERSION_CACHE_TTL)
+
+
+def bump_token_versions(users, floor=0):
+    """Отзывает токены пользователей, записанных в обход User.save().
+
+    Новая версия больше и прежней, и ``floor`` - наибольшей версии до
+    перезаливки таблицы, когда прежние строки уже удалены и их версии
+    не сохранились. Версии сбрасываются и в кеше.
+    """
+    users.update(token_version=Greatest('token_version', Value(floor)) + 1)
+    user_ids = list(users.values_list('pk', flat=True))
+    get_cache().delete_many(
+        [TOKEN_VERSION_KEY.format(user_id) for user_id in user_ids]
+    )
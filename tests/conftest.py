@@ -1,9 +1,29 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture
+def assert_query_budget():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def check(client, url, budget, method='get', **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, **kwargs)
+        queries = [query['sql'] for query in context.captured_queries]
+        assert len(queries) <= budget, (
+            f'Запрос к {url} выполнил {len(queries)} SQL-запросов '
+            f'при бюджете {budget}:\n' + '\n'.join(queries)
+        )
+        return response
+
+    return check
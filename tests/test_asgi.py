@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from rest_framework.test import APIClient
+
+
+async def fallback_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 599,
+                'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def asgi_request(app, path, method='GET', headers=()):
+    from asgiref.testing import ApplicationCommunicator
+
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver')] + list(headers),
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+    async def run():
+        communicator = ApplicationCommunicator(app, scope)
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        body = await communicator.receive_output(5)
+        return start['status'], body['body']
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def app():
+    from api.asgi import AsyncReadApplication
+
+    return AsyncReadApplication(fallback=fallback_app)
+
+
+@pytest.fixture
+def review(django_user_model):
+    from reviews.models import Category, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Сталкер', year=1979,
+                                 category=category)
+    author = django_user_model.objects.create(username='critic',
+                                              email='critic@yamdb.ru')
+    return Review.objects.create(title=title, author=author,
+                                 text='Отзыв', score=9)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadPath:
+
+    def test_hot_reads_match_sync_responses(self, app, review):
+        urls = [
+            '/api/v1/titles/',
+            f'/api/v1/titles/{review.title_id}/',
+            '/api/v1/titles/?name=Стал',
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+            'comments/',
+            '/api/v1/titles/100500/',
+        ]
+        for url in urls:
+            status, body = asgi_request(app, url)
+            response = APIClient().get(url)
+            assert status == response.status_code, (
+                f'Асинхронный путь вернул {status} для {url}'
+            )
+            assert json.loads(body) == response.json(), (
+                f'Ответ асинхронного пути для {url} отличается от '
+                'синхронного'
+            )
+
+    def test_other_requests_use_fallback(self, app, review):
+        cases = [
+            ('/api/v1/titles/', 'POST', ()),
+            ('/api/v1/titles/', 'GET', ((b'authorization', b'Bearer x'),)),
+            ('/api/v1/categories/', 'GET', ()),
+            ('/admin/', 'GET', ()),
+        ]
+        for url, method, headers in cases:
+            status, _ = asgi_request(app, url, method, headers)
+            assert status == 599, (
+                f'{method} {url} должен обрабатываться синхронным '
+                'приложением'
+            )
+
+    def test_fallback_runs_in_orm_threads(self, review):
+        from api.asgi import AsyncReadApplication
+        from asgiref.wsgi import WsgiToAsgi
+
+        threads = set()
+
+        def wsgi_app(environ, start_response):
+            threads.add(threading.current_thread().name)
+            start_response('200 OK', [])
+            return [b'']
+
+        app = AsyncReadApplication(fallback=WsgiToAsgi(wsgi_app))
+        for url in ('/api/v1/categories/', f'/api/v1/titles/'
+                    f'{review.title_id}/'):
+            asgi_request(app, url)
+
+        assert threads and all(name.startswith('orm')
+                               for name in threads), (
+            'Запросы синхронного приложения должны выполняться в пуле '
+            f'ASYNC_ORM_THREADS, а не в потоках {threads}'
+        )
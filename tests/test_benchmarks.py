@@ -0,0 +1,52 @@
+import pytest
+
+
+def dataset_rows():
+    from reviews.models import Review, Title
+
+    return (list(Title.objects.order_by('pk').values_list('name', 'year')),
+            list(Review.objects.order_by('pk').values_list('score',
+                                                           flat=True)))
+
+
+@pytest.mark.django_db
+class TestBenchmarkSuite:
+
+    def test_dataset_is_deterministic(self):
+        from benchmarks.dataset import generate
+        from reviews.models import Category, Genre, Title
+        from users.models import User
+
+        options = dict(users=6, titles=4, reviews_per_title=3,
+                       comments_per_review=1)
+        dataset = generate(**options)
+        rows = dataset_rows()
+        title = Title.objects.order_by('pk').first()
+        scores = list(title.reviews.values_list('score', flat=True))
+        for model in (User, Category, Genre, Title):
+            model.objects.all().delete()
+
+        generate(**options)
+
+        assert dataset['rows']['reviews_review'] == 12
+        assert dataset['rows']['reviews_comment'] == 12
+        assert title.rating == pytest.approx(sum(scores) / len(scores)), (
+            'Рейтинг синтетических произведений должен быть пересчитан'
+        )
+        assert dataset_rows() == rows, (
+            'Одинаковый seed должен давать одинаковые данные'
+        )
+
+    def test_scenario_results(self):
+        from benchmarks.dataset import generate
+        from benchmarks.suite import run_scenario, scenario_data
+
+        data = scenario_data(generate(users=6, titles=4,
+                                      reviews_per_title=3))
+
+        results = run_scenario('titles_list', data, iterations=5,
+                               warmup=1, seed=0)
+
+        assert results['titles_list']['requests'] == 5
+        assert results['titles_list']['errors'] == 0
+        assert results['titles_list']['queries_max'] >= 1
@@ -0,0 +1,48 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestCatalog:
+
+    def test_snapshot_ttl(self, settings):
+        from api.catalog import genres
+        from reviews.models import Genre
+
+        Genre.objects.create(name='Драма', slug='drama')
+        assert genres.get_by_slug('drama') is not None
+        # bulk_create не посылает сигналов: так выглядит запись, версия
+        # которой не дошла до кеша этого процесса.
+        Genre.objects.bulk_create([Genre(name='Комедия', slug='comedy')])
+
+        assert genres.get_by_slug('comedy') is None
+        settings.CATALOG_SNAPSHOT_TTL = 0
+        assert genres.get_by_slug('comedy') is not None, (
+            'Устаревшая копия справочника должна перечитываться'
+        )
+
+    def test_one_version_check_per_request(self, settings):
+        from unittest import mock
+
+        from api import catalog
+        from django.core.cache import caches
+        from reviews.models import Category, Genre, Title, TitleGenre
+
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(5):
+            title = Title.objects.create(name=f'Произведение {number}',
+                                         year=2000, category=category)
+            TitleGenre.objects.create(title=title, genre=genre)
+
+        with mock.patch.object(catalog, 'get_table_versions',
+                               wraps=catalog.get_table_versions) as check:
+            response = APIClient().get('/api/v1/titles/?genre=drama')
+
+        assert response.status_code == 200
+        assert len(response.data['results']) == 5
+        assert check.call_count == 2, (
+            'Версия каждого справочника должна сверяться один раз за '
+            'запрос, а не для каждого произведения'
+        )
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def review(django_user_model):
+    from reviews.models import Comment, Review, Title
+
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'reader{i}', email=f'reader{i}@yamdb.ru')
+        for i in range(13)
+    )
+    authors = list(django_user_model.objects.order_by('pk'))
+    title = Title.objects.create(name='Первое', year=2000)
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text=f'Отзыв {i}', score=5)
+        for i, author in enumerate(authors)
+    )
+    review = Review.objects.order_by('pk').first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=authors[0], text=f'Комментарий {i}')
+        for i in range(13)
+    )
+    # Две группы одинаковых дат: страницы режут их посередине.
+    for model in (Review, Comment):
+        ids = list(model.objects.order_by('pk').values_list('pk',
+                                                            flat=True))
+        for day, group in enumerate((ids[:7], ids[7:]), 1):
+            model.objects.filter(pk__in=group).update(
+                pub_date=datetime(2021, 1, day, tzinfo=timezone.utc)
+            )
+    return review
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.data
+        pages.append([item['id'] for item in response.data['results']])
+        url = response.data['next']
+    return pages, response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('path, model_name', (
+    ('reviews/', 'Review'),
+    ('reviews/{review}/comments/', 'Comment'),
+))
+def test_cursor_walks_equal_pub_dates(review, path, model_name):
+    from reviews import models
+
+    model = getattr(models, model_name)
+    client = APIClient()
+    url = (f'/api/v1/titles/{review.title_id}/'
+           + path.format(review=review.pk) + '?paginator=cursor')
+
+    pages, response = walk(client, url)
+
+    expected = list(model.objects.order_by(
+        '-pub_date', '-id'
+    ).values_list('pk', flat=True))
+    assert [pk for page in pages for pk in page] == expected, (
+        'Курсор должен пройти записи с одинаковой pub_date без пропусков '
+        'и повторов'
+    )
+    assert [len(page) for page in pages] == [5, 5, 3]
+    url = response.data['previous']
+    for page in reversed(pages[:-1]):
+        response = client.get(url)
+        assert [item['id'] for item in response.data['results']] == page
+        url = response.data['previous']
+    assert url is None
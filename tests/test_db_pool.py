@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+from rest_framework.test import APIClient
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.usable = True
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def make_pool(self, **kwargs):
+        from api_yamdb.db.pool import ConnectionPool
+
+        return ConnectionPool(
+            FakeConnection, check=lambda connection: connection.usable,
+            **kwargs
+        )
+
+    def test_connection_is_reused(self):
+        pool = self.make_pool()
+
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+
+        assert second is first, 'Возвращённое соединение должно выдаваться'
+        stats = pool.stats()
+        assert (stats['opened'], stats['in_use'], stats['idle']) == (1, 1, 0)
+
+    def test_waits_for_release_and_times_out(self):
+        from api_yamdb.db.pool import PoolTimeoutError
+
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        connection = pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        threading.Timer(0.01, pool.release, (connection,)).start()
+        pool.timeout = 5
+        assert pool.acquire() is connection, (
+            'Ожидающий поток должен получить освободившееся соединение'
+        )
+        stats = pool.stats()
+        assert stats['timeouts'] == 1
+        assert stats['waited'] == 2
+        assert stats['wait_ms_max'] > 0
+
+    def test_unhealthy_connection_is_replaced(self):
+        pool = self.make_pool(check_interval=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.usable = False
+
+        replacement = pool.acquire()
+
+        assert replacement is not connection, (
+            'Не прошедшее проверку соединение не должно выдаваться'
+        )
+        assert connection.closed
+        assert pool.stats()['health_check_failures'] == 1
+
+
+@pytest.mark.django_db
+class TestConnectionsEndpoint:
+
+    def test_admin_only(self, django_user_model):
+        from api.authentication import access_token_for
+
+        url = '/api/v1/db/connections/'
+        assert APIClient().get(url).status_code == 401
+        admin = django_user_model.objects.create(
+            username='chief', email='chief@yamdb.ru', role='admin'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(admin)}'
+        )
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.data['default']['conn_max_age'] == 60, (
+            'По умолчанию соединения должны быть постоянными'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestHealthChecks:
+
+    def test_stale_connection_is_checked_at_request_start(self):
+        from unittest import mock
+
+        from django.core.signals import request_started
+        from django.db import connection
+
+        connection.ensure_connection()
+        assert connection.health_checked_at > 0, (
+            'Новое соединение должно считаться проверенным'
+        )
+        connection.health_checked_at = 0
+
+        with mock.patch.object(connection, 'is_usable',
+                               return_value=True) as is_usable:
+            request_started.send(sender=None)
+            request_started.send(sender=None)
+
+        is_usable.assert_called_once_with()
+        assert connection.health_checked_at > 0
@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def data(django_user_model):
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    reader, critic = (
+        django_user_model.objects.create(username=username,
+                                         email=f'{username}@yamdb.ru')
+        for username in ('reader', 'critic')
+    )
+    category = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    title = Title.objects.create(name='Первое', year=2000,
+                                 category=category)
+    title.genre.set([drama, comedy])
+    Title.objects.create(name='Второе', year=2001)
+    reviews = [
+        Review.objects.create(title=title, author=author, text=text,
+                              score=score)
+        for author, text, score in ((reader, 'Старый', 4),
+                                    (critic, 'Новый', 8))
+    ]
+    for review, day in zip(reviews, (1, 10)):
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=datetime(2021, 1, day, tzinfo=timezone.utc)
+        )
+        comment = Comment.objects.create(review=review, author=reader,
+                                         text=f'К отзыву {review.text}')
+        Comment.objects.filter(pk=comment.pk).update(
+            pub_date=datetime(2021, 1, day, 12, tzinfo=timezone.utc)
+        )
+    return reviews
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    admin = django_user_model.objects.create(
+        username='admin', email='admin@yamdb.ru', role='admin'
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+def ndjson(response):
+    return [json.loads(line) for line in content(response).splitlines()]
+
+
+@pytest.mark.django_db
+class TestExports:
+
+    def test_admin_only(self, django_user_model, data):
+        assert APIClient().get('/api/v1/export/titles/').status_code == 401
+        client = APIClient()
+        client.force_authenticate(django_user_model.objects.get(
+            username='reader'
+        ))
+
+        assert client.get('/api/v1/export/titles/').status_code == 403, (
+            'Выгрузка доступна только администраторам'
+        )
+
+    def test_titles_ndjson(self, admin_client, data):
+        response = admin_client.get('/api/v1/export/titles/')
+
+        assert response.status_code == 200
+        assert response.streaming, 'Выгрузка должна отдаваться потоком'
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert response['Content-Disposition'] == (
+            'attachment; filename="titles.ndjson"'
+        )
+        first, second = ndjson(response)
+        assert first == {
+            'id': first['id'], 'name': 'Первое', 'year': 2000,
+            'description': '', 'rating': 6.0, 'reviews_count': 2,
+            'category': 'movie', 'genre': ['comedy', 'drama'],
+        }
+        assert (second['name'], second['category'], second['genre']) == (
+            'Второе', None, []
+        )
+
+    def test_reviews_csv(self, admin_client, data):
+        response = admin_client.get('/api/v1/export/reviews/',
+                                    {'output': 'csv'})
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        rows = list(csv.reader(io.StringIO(content(response))))
+        assert rows[0] == ['id', 'title_id', 'author', 'text', 'score',
+                           'pub_date']
+        assert [row[2:] for row in rows[1:]] == [
+            ['reader', 'Старый', '4', '2021-01-01T00:00:00Z'],
+            ['critic', 'Новый', '8', '2021-01-10T00:00:00Z'],
+        ], 'Отзывы выгружаются по возрастанию pub_date'
+
+    @pytest.mark.parametrize('since', ('2021-01-05', '2021-01-05T00:00:00',
+                                       '2021-01-05T03:00:00+03:00'))
+    def test_since(self, admin_client, data, since):
+        reviews = ndjson(admin_client.get('/api/v1/export/reviews/',
+                                          {'since': since}))
+        comments = ndjson(admin_client.get('/api/v1/export/comments/',
+                                           {'since': since}))
+
+        assert [review['text'] for review in reviews] == ['Новый']
+        assert [comment['review_id'] for comment in comments] == [
+            data[1].pk
+        ]
+
+    @pytest.mark.parametrize('url, params, field', (
+        ('/api/v1/export/reviews/', {'since': 'вчера'}, 'since'),
+        ('/api/v1/export/reviews/', {'since': '2021-13-01'}, 'since'),
+        ('/api/v1/export/titles/', {'since': '2021-01-05'}, 'since'),
+        ('/api/v1/export/titles/', {'output': 'xml'}, 'output'),
+    ))
+    def test_bad_request(self, admin_client, data, url, params, field):
+        response = admin_client.get(url, params)
+
+        assert response.status_code == 400
+        assert list(response.data) == [field]
+
+    def test_unknown_dataset(self, admin_client):
+        response = admin_client.get('/api/v1/export/users/')
+
+        assert response.status_code == 404
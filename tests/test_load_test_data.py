@@ -0,0 +1,396 @@
+import csv
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+CSV_FILES = {
+    'users.csv': (
+        ('id', 'username', 'email', 'role'),
+        (1, 'alice', 'alice@yamdb.ru', 'user'),
+        (2, 'bob', 'bob@yamdb.ru', 'user'),
+    ),
+    'category.csv': (
+        ('id', 'name', 'slug'),
+        (1, 'Фильм', 'movie'),
+    ),
+    'genre.csv': (
+        ('id', 'name', 'slug'),
+        (1, 'Драма', 'drama'),
+    ),
+    'titles.csv': (
+        ('id', 'name', 'year', 'category'),
+        (1, 'Первое', 2000, 1),
+        (2, 'Второе', 2001, 1),
+    ),
+    'genre_title.csv': (
+        ('id', 'title_id', 'genre_id'),
+        (1, 1, 1),
+    ),
+    'review.csv': (
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Хорошо', 1, 8, '2020-01-01T00:00:00Z'),
+        (2, 1, 'Плохо', 2, 4, '2020-01-02T00:00:00Z'),
+    ),
+    'comments.csv': (
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 2, '2020-01-03T00:00:00Z'),
+    ),
+}
+
+
+def write_csv(directory, files):
+    for name, rows in files.items():
+        with open(directory / name, 'w', newline='',
+                  encoding='utf-8') as csvfile:
+            csv.writer(csvfile).writerows(rows)
+    return str(directory) + '/'
+
+
+@pytest.mark.django_db
+class TestLoadTestData:
+
+    def test_full_reload(self, tmp_path):
+        from django.db.models.signals import post_delete
+        from reviews.models import Category, Review, Title, TitleStats
+
+        old = Category.objects.create(name='Старая', slug='old')
+        Title.objects.create(name='Старое', year=1990, category=old)
+        deleted = []
+
+        def receiver(sender, **kwargs):
+            deleted.append(sender)
+
+        post_delete.connect(receiver)
+        try:
+            call_command('load_test_data',
+                         csv_path=write_csv(tmp_path, CSV_FILES))
+        finally:
+            post_delete.disconnect(receiver)
+
+        assert deleted == [], (
+            'Полная заливка должна очищать таблицы без построчного '
+            'удаления и сигналов'
+        )
+        assert list(Title.objects.values_list('name', flat=True)) == [
+            'Второе', 'Первое'
+        ]
+        title = Title.objects.get(pk=1)
+        assert (title.reviews_count, title.rating) == (2, 6.0)
+        assert TitleStats.objects.get(title=title).scores[8] == 1
+        assert Review.objects.count() == 2
+
+    def test_sync_touches_changed_rows(self, tmp_path):
+        from unittest import mock
+
+        from api.cache import get_table_versions
+        from reviews.management.commands import load_test_data
+        from reviews.models import Genre, Review, Title, TitleStats
+
+        csv_path = write_csv(tmp_path, CSV_FILES)
+        call_command('load_test_data', csv_path=csv_path, sync=True)
+        assert Title.objects.get(pk=1).rating == 6.0
+        # Второй отзыв переезжает на второе произведение.
+        files = dict(CSV_FILES, **{'review.csv': (
+            CSV_FILES['review.csv'][:2]
+            + ((2, 2, 'Плохо', 2, 4, '2020-01-02T00:00:00Z'),)
+        )})
+        write_csv(tmp_path, files)
+        genre_table = Genre._meta.db_table
+        genre_version = get_table_versions((genre_table,))[genre_table]
+
+        with mock.patch.object(
+            load_test_data, 'recalculate_ratings',
+            wraps=load_test_data.recalculate_ratings
+        ) as recalculate:
+            call_command('load_test_data', csv_path=csv_path, sync=True)
+
+        (queryset,), _ = recalculate.call_args
+        assert sorted(queryset.values_list('pk', flat=True)) == [1, 2], (
+            'Пересчитываться должны прежнее и новое произведения отзыва'
+        )
+        assert Review.objects.get(pk=2).title_id == 2
+        assert [(title.reviews_count, title.rating)
+                for title in Title.objects.order_by('pk')] == [
+            (1, 8.0), (1, 4.0)
+        ]
+        assert TitleStats.objects.get(title_id=2).scores[4] == 1
+        assert get_table_versions((genre_table,))[genre_table] == (
+            genre_version
+        ), 'Версии не изменившихся таблиц не должны сдвигаться'
+
+    def test_sync_without_changes(self, tmp_path):
+        from unittest import mock
+
+        from reviews.management.commands import load_test_data
+
+        csv_path = write_csv(tmp_path, CSV_FILES)
+        call_command('load_test_data', csv_path=csv_path, sync=True)
+        with mock.patch.object(load_test_data, 'recalculate_ratings') as (
+                recalculate), mock.patch.object(
+                    load_test_data, 'invalidate') as invalidate:
+            call_command('load_test_data', csv_path=csv_path, sync=True)
+
+        recalculate.assert_not_called()
+        invalidate.assert_not_called()
+
+    def test_sync_revokes_tokens_of_changed_users(self, tmp_path):
+        from django.contrib.auth import get_user_model
+
+        users = CSV_FILES['users.csv']
+        csv_path = write_csv(tmp_path, dict(CSV_FILES, **{'users.csv': (
+            users[0], (1, 'alice', 'alice@yamdb.ru', 'admin'), users[2]
+        )}))
+        call_command('load_test_data', csv_path=csv_path, sync=True)
+        alice, bob = get_user_model().objects.order_by('pk')
+        alice_client, bob_client = client_for(alice), client_for(bob)
+        assert alice_client.get('/api/v1/users/').status_code == 200
+
+        write_csv(tmp_path, dict(CSV_FILES, **{'users.csv': (
+            users[0], users[1], (2, 'bob', 'bob@yamdb.ru', 'user'),
+        )}))
+        call_command('load_test_data', csv_path=csv_path, sync=True)
+
+        assert alice_client.get('/api/v1/users/').status_code == 401, (
+            'Токен пользователя, которому синхронизация сменила роль, '
+            'должен отклоняться'
+        )
+        assert bob_client.get('/api/v1/users/me/').status_code == 200, (
+            'Токены пользователей без изменений остаются действительными'
+        )
+        alice.refresh_from_db()
+        assert client_for(alice).get('/api/v1/users/').status_code == 403
+
+    def test_full_reload_revokes_tokens(self, tmp_path):
+        from django.contrib.auth import get_user_model
+
+        User = get_user_model()
+        csv_path = write_csv(tmp_path, CSV_FILES)
+        call_command('load_test_data', csv_path=csv_path)
+        alice = User.objects.get(pk=1)
+        client = client_for(alice)
+        assert client.get('/api/v1/users/me/').status_code == 200
+
+        call_command('load_test_data', csv_path=csv_path)
+
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Перезаливка пользователей должна отзывать выданные токены'
+        )
+        assert client_for(User.objects.get(pk=1)).get(
+            '/api/v1/users/me/'
+        ).status_code == 200
+
+
+def client_for(user):
+    from api.authentication import access_token_for
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}'
+    )
+    return client
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        csv.writer(csvfile).writerows(rows)
+    return str(path)
+
+
+@pytest.mark.django_db
+class TestLoaders:
+
+    def test_read_batches(self, tmp_path):
+        from reviews.loaders import read_batches
+
+        path = write_rows(tmp_path / 'genre.csv', (
+            ('id', 'name', 'slug'),
+            *((i, f'Жанр {i}', f'genre-{i}') for i in range(5)),
+        ))
+
+        batches = list(read_batches(path, 2))
+
+        assert [len(batch) for _, batch in batches] == [2, 2, 1]
+        assert all(headers == ['id', 'name', 'slug']
+                   for headers, _ in batches)
+
+    def test_load_orm_skips_broken_references(self, tmp_path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.loaders import load_orm
+        from reviews.models import Category, Title
+
+        Category.objects.create(pk=1, name='Фильм', slug='movie')
+        path = write_rows(tmp_path / 'titles.csv', (
+            ('id', 'name', 'year', 'category'),
+            (1, 'Первое', 2000, 1),
+            (2, 'Второе', 2000, 99),
+            (3, 'Третье', 2000, ''),
+            (4, 'Четвёртое', 2000, 1),
+            (5, 'Пятое', 2000, 1),
+        ))
+
+        with CaptureQueriesContext(connection) as context:
+            progress = load_orm(Title, path, batch_size=2)
+
+        assert (progress.loaded, progress.skipped) == (4, 1)
+        assert sorted(Title.objects.values_list('pk', flat=True)) == [
+            1, 3, 4, 5
+        ], 'Строка со ссылкой на несуществующую категорию пропускается'
+        assert Title.objects.get(pk=3).category_id is None
+        # На пачку - проверка внешнего ключа и вставка.
+        assert len(context.captured_queries) <= 3 * 2
+
+    def test_sync_insert_update_delete(self, tmp_path):
+        from reviews.loaders import delete_missing, sync_file
+        from reviews.models import Genre, ImportedRow
+
+        path = tmp_path / 'genre.csv'
+        write_rows(path, (
+            ('id', 'name', 'slug'),
+            (1, 'Драма', 'drama'),
+            (2, 'Комедия', 'comedy'),
+        ))
+        result = sync_file(Genre, str(path), batch_size=1)
+        assert (result.seen, result.written) == ({1, 2}, 2)
+
+        write_rows(path, (
+            ('id', 'name', 'slug'),
+            (1, 'Драма', 'drama'),
+            (3, 'Мелодрама', 'melodrama'),
+        ))
+        Genre.objects.filter(pk=1).update(name='Изменено вручную')
+        result = sync_file(Genre, str(path), batch_size=1)
+        delete_missing(Genre, result.seen, batch_size=1)
+
+        assert result.written == 1, (
+            'Совпавшие с прошлой загрузкой строки не перезаписываются'
+        )
+        assert dict(Genre.objects.values_list('pk', 'name')) == {
+            1: 'Изменено вручную', 3: 'Мелодрама'
+        }
+        assert sorted(ImportedRow.objects.filter(
+            table=Genre._meta.db_table
+        ).values_list('object_id', flat=True)) == [1, 3]
+
+        write_rows(path, (
+            ('id', 'name', 'slug'),
+            (1, 'Драма', 'drama'),
+            (3, 'Мелодрама', 'melo'),
+        ))
+        result = sync_file(Genre, str(path), batch_size=1)
+        assert result.written == 1
+        assert Genre.objects.get(pk=3).slug == 'melo'
+
+    @pytest.mark.skipif(
+        connection.vendor != 'postgresql',
+        reason='индексы и внешние ключи снимаются только на PostgreSQL'
+    )
+    def test_deferred_constraints_round_trip(self):
+        from reviews.loaders import deferred_constraints
+        from reviews.models import Review, Title
+
+        def constraints():
+            with connection.cursor() as cursor:
+                return {
+                    name: (info['columns'], info['foreign_key'],
+                           info['index'], info['unique'])
+                    for model in (Title, Review)
+                    for name, info in connection.introspection.get_constraints(
+                        cursor, model._meta.db_table
+                    ).items()
+                }
+
+        before = constraints()
+        with deferred_constraints([Title, Review]):
+            during = constraints()
+        after = constraints()
+
+        assert after == before, (
+            'Индексы и внешние ключи должны быть восстановлены'
+        )
+        assert not any(foreign_key for _, foreign_key, _, _
+                       in during.values())
+        assert {name for name, (_, _, _, unique) in before.items()
+                if unique} <= set(during), (
+            'Первичные ключи и ограничения уникальности нужны ON CONFLICT'
+        )
+        assert len(during) < len(before)
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='процессы пула подключаются к общей базе только на PostgreSQL'
+)
+@pytest.mark.django_db(transaction=True)
+def test_load_parallel(tmp_path):
+    from reviews.loaders import load_parallel
+    from reviews.management.commands.load_test_data import CSV_MODELS
+    from reviews.models import Comment, Review, Title, TitleGenre
+
+    write_csv(tmp_path, CSV_FILES)
+    files = {model: str(tmp_path / name)
+             for name, model in CSV_MODELS.items()}
+
+    load_parallel(files, 'orm', batch_size=1, jobs=3)
+
+    assert [model.objects.count() for model in (
+        Title, TitleGenre, Review, Comment
+    )] == [2, 1, 2, 1], (
+        'Зависимые таблицы должны загружаться после тех, на которые '
+        'ссылаются'
+    )
+
+
+def fake_model(name, *targets):
+    """Модель для dependency_levels: только таблица и внешние ключи."""
+    return type(name, (), {'_meta': SimpleNamespace(
+        db_table=name,
+        concrete_fields=[SimpleNamespace(is_relation=True,
+                                         related_model=target)
+                         for target in targets],
+    )})
+
+
+class TestDependencyLevels:
+
+    def test_csv_models(self):
+        from reviews.loaders import dependency_levels
+        from reviews.management.commands.load_test_data import CSV_MODELS
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    TitleGenre)
+        from users.models import User
+
+        assert dependency_levels(list(CSV_MODELS.values())) == [
+            [User, Category, Genre],
+            [Title],
+            [TitleGenre, Review],
+            [Comment],
+        ]
+
+    def test_references_outside_and_to_self_are_ignored(self):
+        from reviews.loaders import dependency_levels
+
+        outside = fake_model('outside')
+        parent = fake_model('parent', outside)
+        child = fake_model('child', parent)
+        child._meta.concrete_fields.append(
+            SimpleNamespace(is_relation=True, related_model=child)
+        )
+
+        assert dependency_levels([child, parent]) == [[parent], [child]]
+
+    def test_cycle(self):
+        from reviews.loaders import dependency_levels
+
+        first = fake_model('first')
+        second = fake_model('second', first)
+        first._meta.concrete_fields.append(
+            SimpleNamespace(is_relation=True, related_model=second)
+        )
+        independent = fake_model('independent')
+
+        with pytest.raises(ValueError, match='first, second'):
+            dependency_levels([independent, first, second])
@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def registry(settings):
+    from api.metrics import registry
+    from django.core.cache import caches
+
+    # Ответ из кеша не обращается к базе.
+    caches[settings.RESPONSE_CACHE_ALIAS].clear()
+    registry.clear()
+    yield registry
+    registry.clear()
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+
+    def test_metrics_by_view_name(self, registry, django_user_model):
+        from api.authentication import access_token_for
+
+        APIClient().get('/api/v1/titles/')
+        admin = django_user_model.objects.create(
+            username='chief', email='chief@yamdb.ru', role='admin'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(admin)}'
+        )
+
+        response = client.get('/api/v1/metrics/')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        series = 'view="api:v1_titles-list",method="GET"'
+        assert f'yamdb_request_duration_seconds_count{{{series}}} 1' in text, (
+            'Время запроса должно учитываться по имени вьюхи'
+        )
+        assert f'yamdb_requests_total{{{series},status="200"}} 1' in text
+        assert f'yamdb_request_db_queries_bucket{{{series},le="0"}} 0' in (
+            text
+        ), 'Запросы к базе должны учитываться'
+        assert APIClient().get('/api/v1/metrics/').status_code == 401
+
+    def test_slow_request_logged_with_sql(self, registry, settings, caplog):
+        settings.SLOW_REQUEST_THRESHOLD = 0
+
+        with caplog.at_level(logging.WARNING, logger='api.middleware'):
+            APIClient().get('/api/v1/categories/')
+
+        assert len(caplog.records) == 1, (
+            'Запрос дольше порога должен попадать в журнал'
+        )
+        assert 'reviews_category' in caplog.records[0].getMessage(), (
+            'В журнал должны попадать SQL-выражения запроса'
+        )
+
+    def test_unknown_methods_share_series(self, registry):
+        client = APIClient()
+        for method in ('FOO', 'BAR', 'BAZ'):
+            client.generic(method, '/api/v1/titles/')
+
+        text = registry.render()
+
+        assert 'method="other"' in text
+        assert not any(f'method="{method}"' in text
+                       for method in ('FOO', 'BAR', 'BAZ')), (
+            'Произвольные методы не должны создавать новые серии'
+        )
@@ -0,0 +1,72 @@
+import os
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+SIGNUP_DATA = {'username': 'newcomer', 'email': 'newcomer@yamdb.ru'}
+
+
+@pytest.fixture
+def mail_dir(settings, tmp_path):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+    settings.EMAIL_FILE_PATH = str(tmp_path)
+    return tmp_path
+
+
+def sent_messages(path):
+    return [(path / name).read_text() for name in sorted(os.listdir(path))]
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_enqueues_instead_of_sending(self, mail_dir):
+        from users.models import OutgoingEmail
+
+        response = APIClient().post('/api/v1/auth/signup/', SIGNUP_DATA)
+
+        assert response.status_code == 200, (
+            'Регистрация должна отвечать 200 после постановки письма в '
+            'очередь'
+        )
+        assert sent_messages(mail_dir) == [], (
+            'Регистрация не должна отправлять письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == SIGNUP_DATA['email']
+        assert email.sent_at is None
+
+    def test_worker_sends_queued_email_once(self, mail_dir):
+        from users.models import OutgoingEmail
+
+        APIClient().post('/api/v1/auth/signup/', SIGNUP_DATA)
+        call_command('send_outbox_emails', '--once')
+        call_command('send_outbox_emails', '--once')
+
+        messages = sent_messages(mail_dir)
+        assert len(messages) == 1, (
+            'Воркер должен отправить письмо из очереди ровно один раз'
+        )
+        assert 'Ваш код подтверждения' in messages[0]
+        assert OutgoingEmail.objects.get().sent_at is not None
+
+    def test_failed_email_is_retried_with_backoff(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending, enqueue_email
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        enqueue_email('Тема', 'Текст', ['retry@yamdb.ru'])
+        with mock.patch('users.outbox.EmailMessage.send',
+                        side_effect=OSError('SMTP недоступен')):
+            assert deliver_pending(10, 3, 60) == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1
+        assert email.last_error == 'SMTP недоступен'
+        assert email.send_after > email.created, (
+            'Неудачная отправка должна откладывать следующую попытку'
+        )
+        assert deliver_pending(10, 3, 60) == (0, 0), (
+            'Письмо не должно отправляться повторно до истечения задержки'
+        )
@@ -0,0 +1,138 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+QUERY_BUDGETS = {
+    'v1_titles-list': 3,
+    'v1_titles-detail': 2,
+    'v1_titles-create': 7,
+    'v1_reviews-list': 4,
+    'v1_reviews-detail': 3,
+    'v1_comments-list': 4,
+}
+
+
+def warm_catalogs():
+    from api.catalog import categories, genres
+
+    categories.snapshot()
+    genres.snapshot()
+
+
+@pytest.fixture
+def catalogue():
+    from reviews.models import Category, Genre, Title, TitleGenre
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(4)
+    ]
+    titles = [
+        Title.objects.create(name=f'Произведение {i}', year=2000,
+                             category=categories[i % len(categories)])
+        for i in range(12)
+    ]
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title=title, genre=genre)
+        for title in titles for genre in genres[:3]
+    )
+    warm_catalogs()
+    return titles
+
+
+@pytest.fixture
+def discussion(catalogue, django_user_model):
+    from reviews.models import Comment, Review
+
+    authors = [
+        django_user_model.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+        for i in range(8)
+    ]
+    title = catalogue[0]
+    reviews = [
+        Review.objects.create(title=title, author=author,
+                              text='Отзыв', score=i + 1)
+        for i, author in enumerate(authors)
+    ]
+    for i in range(12):
+        Comment.objects.create(review=reviews[0], author=authors[i % 3],
+                               text='Комментарий')
+    return title, reviews[0]
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('page', (1, 2, 3))
+    def test_titles_list(self, catalogue, assert_query_budget, page):
+        url = reverse('api:v1_titles-list') + f'?page={page}'
+        response = assert_query_budget(
+            APIClient(), url, QUERY_BUDGETS['v1_titles-list']
+        )
+        assert response.status_code == 200
+        assert all(len(title['genre']) == 3
+                   for title in response.data['results'])
+
+    def test_titles_detail(self, catalogue, assert_query_budget):
+        url = reverse('api:v1_titles-detail', args=(catalogue[0].id,))
+        response = assert_query_budget(
+            APIClient(), url, QUERY_BUDGETS['v1_titles-detail']
+        )
+        assert response.status_code == 200
+
+    def test_titles_create(self, catalogue, assert_query_budget,
+                           django_user_model):
+        admin = django_user_model.objects.create(
+            username='admin', email='admin@yamdb.ru', role='admin'
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        data = {
+            'name': 'Новое произведение',
+            'year': 2000,
+            'category': 'category-0',
+            'genre': ['genre-0', 'genre-1', 'genre-2', 'genre-3'],
+        }
+        response = assert_query_budget(
+            client, reverse('api:v1_titles-list'),
+            QUERY_BUDGETS['v1_titles-create'],
+            method='post', data=data, format='json'
+        )
+        assert response.status_code == 201, response.data
+
+    @pytest.mark.parametrize('page', (1, 2))
+    def test_reviews_list(self, discussion, assert_query_budget, page):
+        title, _ = discussion
+        url = reverse('api:v1_reviews-list', args=(title.id,))
+        response = assert_query_budget(
+            APIClient(), f'{url}?page={page}',
+            QUERY_BUDGETS['v1_reviews-list']
+        )
+        assert response.status_code == 200
+        assert all(review['author'].startswith('user')
+                   for review in response.data['results'])
+
+    def test_reviews_detail(self, discussion, assert_query_budget):
+        title, review = discussion
+        url = reverse('api:v1_reviews-detail', args=(title.id, review.id))
+        response = assert_query_budget(
+            APIClient(), url, QUERY_BUDGETS['v1_reviews-detail']
+        )
+        assert response.data['author'] == review.author.username
+
+    @pytest.mark.parametrize('page', (1, 2, 3))
+    def test_comments_list(self, discussion, assert_query_budget, page):
+        title, review = discussion
+        url = reverse('api:v1_comments-list', args=(title.id, review.id))
+        response = assert_query_budget(
+            APIClient(), f'{url}?page={page}',
+            QUERY_BUDGETS['v1_comments-list']
+        )
+        assert response.status_code == 200
+        assert all(comment['author'].startswith('user')
+                   for comment in response.data['results'])
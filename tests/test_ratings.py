@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def titles(django_user_model):
+    from reviews.models import Title
+
+    authors = [
+        django_user_model.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+        for i in range(3)
+    ]
+    first = Title.objects.create(name='Первое', year=2000)
+    second = Title.objects.create(name='Второе', year=2000)
+    return first, second, authors
+
+
+def counters(title):
+    title.refresh_from_db()
+    return title.reviews_count, title.score_sum, title.rating
+
+
+@pytest.mark.django_db
+class TestRatingCounters:
+
+    def test_create(self, titles):
+        from reviews.models import Review
+
+        first, _, authors = titles
+        assert counters(first) == (0, 0, None)
+
+        Review.objects.create(title=first, author=authors[0], text='А',
+                              score=8)
+        Review.objects.create(title=first, author=authors[1], text='Б',
+                              score=5)
+
+        assert counters(first) == (2, 13, 6.5)
+
+    def test_score_change(self, titles):
+        from reviews.models import Review
+
+        first, _, authors = titles
+        review = Review.objects.create(title=first, author=authors[0],
+                                       text='А', score=8)
+        Review.objects.create(title=first, author=authors[1], text='Б',
+                              score=4)
+
+        review.score = 2
+        review.save()
+        assert counters(first) == (2, 6, 3.0)
+        # Повторное сохранение без изменений не сдвигает счётчики.
+        review.save()
+        assert counters(first) == (2, 6, 3.0)
+
+    def test_move_between_titles(self, titles):
+        from reviews.models import Review
+
+        first, second, authors = titles
+        Review.objects.create(title=first, author=authors[0], text='А',
+                              score=8)
+        review = Review.objects.create(title=first, author=authors[1],
+                                       text='Б', score=4)
+        review = Review.objects.get(pk=review.pk)
+
+        review.title = second
+        review.score = 10
+        review.save()
+
+        assert counters(first) == (1, 8, 8.0)
+        assert counters(second) == (1, 10, 10.0)
+
+    def test_delete(self, titles):
+        from reviews.models import Review
+
+        first, _, authors = titles
+        review = Review.objects.create(title=first, author=authors[0],
+                                       text='А', score=8)
+        Review.objects.create(title=first, author=authors[1], text='Б',
+                              score=4)
+
+        review.delete()
+        assert counters(first) == (1, 4, 4.0)
+        Review.objects.filter(title=first).delete()
+        assert counters(first) == (0, 0, None), (
+            'Без отзывов рейтинг должен быть пустым'
+        )
+
+    def test_recalculate_command(self, titles):
+        from reviews.models import Review, Title
+
+        first, second, authors = titles
+        Review.objects.bulk_create([
+            Review(title=first, author=authors[0], text='А', score=9),
+            Review(title=first, author=authors[1], text='Б', score=6),
+            Review(title=second, author=authors[2], text='В', score=3),
+        ])
+        # bulk_create не посылает сигналов, счётчики рассинхронизированы.
+        Title.objects.filter(pk=second.pk).update(reviews_count=5,
+                                                  score_sum=1, rating=0.2)
+
+        call_command('recalculate_ratings')
+
+        assert counters(first) == (2, 15, 7.5)
+        assert counters(second) == (1, 3, 3.0)
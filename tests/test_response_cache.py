@@ -0,0 +1,196 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def version(model):
+    from api.cache import get_table_versions
+
+    table = model._meta.db_table
+    return get_table_versions((table,))[table]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_versions_bumped_after_commit():
+    from django.db import transaction
+    from reviews.models import Genre
+
+    with transaction.atomic():
+        Genre.objects.create(name='Драма', slug='drama')
+        # Читатель до фиксации видит версию, но не строку.
+        seen_before_commit = version(Genre)
+    assert version(Genre) != seen_before_commit, (
+        'Версия таблицы должна сдвигаться после фиксации транзакции'
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_invalidation_resets_scopes():
+    from api.cache import get_table_versions, scope
+    from api.signals import invalidate
+    from reviews.models import Review
+
+    scopes = [scope(Review._meta.db_table, title=1)]
+    before = get_table_versions(scopes)
+    invalidate(Review, {'title_id': {2}})
+    assert get_table_versions(scopes) == before, (
+        'Запись в отзывы другого произведения не сбрасывает область'
+    )
+    invalidate(Review)
+    assert get_table_versions(scopes) != before, (
+        'Запись в обход сигналов должна сбрасывать все области таблицы'
+    )
+
+
+@pytest.fixture
+def discussion(django_user_model, settings):
+    from django.core.cache import caches
+    from reviews.models import Review, Title
+
+    caches[settings.RESPONSE_CACHE_ALIAS].clear()
+    author = django_user_model.objects.create(username='author',
+                                              email='author@yamdb.ru')
+    first = Title.objects.create(name='Первое', year=2000)
+    second = Title.objects.create(name='Второе', year=2000)
+    review = Review.objects.create(title=first, author=author, text='Да',
+                                   score=7)
+    return first, second, review
+
+
+def reviews_url(title):
+    return f'/api/v1/titles/{title.pk}/reviews/'
+
+
+def etag(url):
+    response = APIClient().get(url)
+    assert response.status_code == 200, response.data
+    return response['ETag']
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_etag_not_modified(self, discussion):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Title
+
+        client = APIClient()
+        first = client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get('/api/v1/titles/')
+            not_modified = client.get('/api/v1/titles/',
+                                      HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert cached.data == first.data
+        assert cached['ETag'] == first['ETag']
+        assert not_modified.status_code == 304
+        assert len(context.captured_queries) == 0, (
+            'Ответ из кеша и 304 не должны обращаться к базе'
+        )
+        Title.objects.create(name='Третье', year=2000)
+        response = client.get('/api/v1/titles/',
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert response.data['count'] == 3
+
+    def test_review_writes_invalidate_own_title(self, discussion):
+        from reviews.models import Review
+
+        first, second, review = discussion
+        first_etag, second_etag = etag(reviews_url(first)), etag(
+            reviews_url(second)
+        )
+
+        Review.objects.create(title=second, author=review.author,
+                              text='Нет', score=2)
+        assert etag(reviews_url(first)) == first_etag, (
+            'Отзыв на другое произведение не должен сбрасывать кеш'
+        )
+        assert etag(reviews_url(second)) != second_etag
+
+    def test_review_move_invalidates_both_titles(self, discussion):
+        from reviews.models import Review
+
+        first, second, review = discussion
+        first_etag, second_etag = etag(reviews_url(first)), etag(
+            reviews_url(second)
+        )
+        review = Review.objects.get(pk=review.pk)
+
+        review.title = second
+        review.save()
+
+        assert etag(reviews_url(first)) != first_etag, (
+            'Перенос отзыва должен сбрасывать кеш прежнего произведения'
+        )
+        assert etag(reviews_url(second)) != second_etag
+
+    def test_user_writes(self, discussion, django_user_model):
+        first, _, review = discussion
+        url = reviews_url(first)
+        before = etag(url)
+
+        django_user_model.objects.create(username='newcomer',
+                                         email='newcomer@yamdb.ru')
+        author = django_user_model.objects.get(pk=review.author_id)
+        author.bio = 'Критик'
+        author.save()
+        assert etag(url) == before, (
+            'Регистрация и правка профиля не должны сбрасывать кеш отзывов'
+        )
+
+        author.username = 'critic'
+        author.save()
+        response = APIClient().get(url)
+        assert response['ETag'] != before
+        assert response.data['results'][0]['author'] == 'critic'
+
+
+@pytest.mark.django_db
+class TestCachedCount:
+
+    def test_count_cached_until_write(self, admin_user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Genre
+
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(7)
+        )
+        # Запрос пользователя минует кеш ответов, но не кеш счётчика.
+        first = admin_user_client.get('/api/v1/genres/')
+        with CaptureQueriesContext(connection) as context:
+            second = admin_user_client.get('/api/v1/genres/?page=2')
+
+        assert (first.data['count'], first.data['count_exact']) == (7, True)
+        assert second.data['count'] == 7
+        assert not any('COUNT(' in query['sql'].upper()
+                       for query in context.captured_queries), (
+            'Число объектов должно браться из кеша'
+        )
+        Genre.objects.create(name='Новый', slug='new')
+        assert admin_user_client.get('/api/v1/genres/').data['count'] == 8
+
+    def test_estimated_count(self, admin_user_client):
+        from unittest import mock
+
+        from reviews.models import Genre
+
+        Genre.objects.create(name='Драма', slug='drama')
+        with mock.patch('api.pagination.estimate_count',
+                        return_value=250000):
+            response = admin_user_client.get('/api/v1/genres/')
+
+        assert (response.data['count'], response.data['count_exact']) == (
+            250000, False
+        )
+
+
+@pytest.fixture
+def admin_user_client(django_user_model):
+    admin = django_user_model.objects.create(
+        username='chief', email='chief@yamdb.ru', role='admin'
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
@@ -0,0 +1,76 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def names(url):
+    response = APIClient().get(url)
+    assert response.status_code == 200, response.data
+    return [item['name'] for item in response.data['results']]
+
+
+class TestTrigramSimilarity:
+
+    def test_trigrams_match_pg_trgm(self):
+        from api.search import trigrams
+
+        # SELECT show_trgm('word');
+        assert trigrams('word') == {'  w', ' wo', 'wor', 'ord', 'rd '}
+        # Регистр и знаки препинания не учитываются, слова - по одному.
+        assert trigrams('Two, words!') == trigrams('two words')
+
+    @pytest.mark.parametrize('left, right, expected', (
+        # SELECT similarity(left, right);
+        ('word', 'two words', 0.363636),
+        ('matrix', 'Matrix', 1.0),
+        ('abc', 'xyz', 0.0),
+        ('', 'word', 0.0),
+    ))
+    def test_similarity_matches_pg_trgm(self, left, right, expected):
+        from api.search import trigram_similarity
+
+        assert trigram_similarity(left, right) == pytest.approx(
+            expected, abs=1e-6
+        )
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_titles_by_name_and_description(self):
+        from reviews.models import Title
+
+        Title.objects.create(name='The Matrix Reloaded', year=2003)
+        Title.objects.create(name='Inception', year=2010,
+                             description='Dreams inside a matrix of dreams')
+        Title.objects.create(name='Matrix', year=1999)
+        Title.objects.create(name='Solaris', year=1972,
+                             description='Ocean planet')
+
+        assert names('/api/v1/titles/?search=matrix') == [
+            'Matrix', 'The Matrix Reloaded', 'Inception'
+        ], 'Результаты поиска должны идти по убыванию похожести'
+        assert names('/api/v1/titles/?search=ocean') == ['Solaris']
+        assert names('/api/v1/titles/?search=nothing') == []
+
+    def test_genres(self):
+        from reviews.models import Genre
+
+        Genre.objects.create(name='Melodrama', slug='melodrama')
+        Genre.objects.create(name='Comedy', slug='comedy')
+        Genre.objects.create(name='Drama', slug='drama')
+
+        assert names('/api/v1/genres/?search=dra') == ['Drama', 'Melodrama']
+
+    def test_categories(self):
+        from reviews.models import Category
+
+        Category.objects.create(name='Short film', slug='short-film')
+        Category.objects.create(name='Film', slug='film')
+        Category.objects.create(name='Book', slug='book')
+
+        assert names('/api/v1/categories/?search=film') == [
+            'Film', 'Short film'
+        ]
+        assert names('/api/v1/categories/?search=short-film') == [
+            'Short film'
+        ]
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def client_for(user):
+    from django.contrib.auth.tokens import default_token_generator
+
+    response = APIClient().post('/api/v1/auth/token/', {
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.data["access_token"]}'
+    )
+    return client
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='chief', email='chief@yamdb.ru', role='admin'
+    )
+
+
+@pytest.mark.django_db
+class TestStatelessAuth:
+
+    def test_permission_check_without_queries(self, admin):
+        client = client_for(admin)
+        client.post('/api/v1/categories/', {'name': 'Книга', 'slug': 'b'})
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/genres/',
+                                   {'name': 'Роман', 'slug': 'novel'})
+
+        assert response.status_code == 201, (
+            'Роль администратора должна браться из токена'
+        )
+        user_queries = [query['sql'] for query in context.captured_queries
+                        if 'users_user' in query['sql']]
+        assert user_queries == [], (
+            'Аутентификация по токену не должна запрашивать пользователя:\n'
+            + '\n'.join(user_queries)
+        )
+
+    def test_demotion_revokes_token(self, admin):
+        client = client_for(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+
+        admin.role = 'user'
+        admin.save()
+
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'После смены роли выданный ранее токен должен отклоняться'
+        )
+        assert client_for(admin).get('/api/v1/users/').status_code == 403
+
+    def test_deleted_user_token_is_revoked(self, admin):
+        client = client_for(admin)
+        admin.delete()
+
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Токен удалённого пользователя должен отклоняться'
+        )
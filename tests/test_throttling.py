@@ -0,0 +1,83 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+class TestSlidingWindowCounter:
+
+    def make_counter(self, limit=3, window=60):
+        from django.core.cache.backends.locmem import LocMemCache
+
+        from api.throttling import SlidingWindowCounter
+
+        return SlidingWindowCounter(
+            LocMemCache('throttle-test', {}), limit, window
+        )
+
+    def test_limit_within_window(self):
+        counter = self.make_counter()
+
+        results = [counter.hit('ip', now=600 + i)[0] for i in range(4)]
+
+        assert results == [True, True, True, False], (
+            'Четвёртый запрос в окне при лимите 3 должен отклоняться'
+        )
+
+    def test_previous_window_is_weighted(self):
+        counter = self.make_counter()
+        for i in range(3):
+            counter.hit('ip', now=600 + i)
+
+        assert counter.hit('ip', now=661)[0] is False, (
+            'В начале следующего окна должны учитываться запросы '
+            'предыдущего'
+        )
+        allowed, wait = counter.hit('ip', now=715)
+        assert allowed is True, (
+            'Когда предыдущее окно почти вышло, запрос должен проходить'
+        )
+        assert wait == 0
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def test_token_attempts_limited_by_username(self, settings,
+                                                django_user_model):
+        settings.AUTH_THROTTLE_RATES = {'token_username': '3/min'}
+        django_user_model.objects.create(username='victim',
+                                         email='victim@yamdb.ru')
+        client = APIClient()
+        data = {'username': 'victim', 'confirmation_code': 'wrong'}
+
+        codes = [client.post('/api/v1/auth/token/', data).status_code
+                 for _ in range(4)]
+
+        assert codes[:3] == [400, 400, 400]
+        assert codes[3] == 429, (
+            'Перебор кода подтверждения должен ограничиваться по username'
+        )
+        other = client.post('/api/v1/auth/token/',
+                            {'username': 'other', 'confirmation_code': 'x'})
+        assert other.status_code != 429, (
+            'Лимит по username не должен затрагивать других пользователей'
+        )
+
+    @pytest.mark.parametrize('num_proxies', (0, 1))
+    def test_forwarded_for_cannot_be_rotated(self, settings, num_proxies):
+        settings.AUTH_THROTTLE_RATES = {'signup_ip': '2/min'}
+        settings.REST_FRAMEWORK = dict(settings.REST_FRAMEWORK,
+                                       NUM_PROXIES=num_proxies)
+        client = APIClient()
+
+        # Клиент подставляет новый адрес в каждый запрос, прокси
+        # дописывает настоящий в конец заголовка.
+        codes = [
+            client.post('/api/v1/auth/signup/', {},
+                        HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 192.0.2.1'
+                        ).status_code
+            for i in range(3)
+        ]
+
+        assert codes[2] == 429, (
+            'Подмена X-Forwarded-For не должна обходить лимит по IP'
+        )
@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Genre, Title, TitleGenre
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    moviebook = Category.objects.create(name='Кинокнига', slug='moviebook')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    dramedy = Genre.objects.create(name='Драмеди', slug='drama-comedy')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    first = Title.objects.create(name='Первое', year=2000, category=movie)
+    second = Title.objects.create(name='Второе', year=2000,
+                                  category=moviebook)
+    third = Title.objects.create(name='Третье', year=2000, category=movie)
+    TitleGenre.objects.bulk_create([
+        TitleGenre(title=first, genre=drama),
+        TitleGenre(title=first, genre=comedy),
+        TitleGenre(title=second, genre=dramedy),
+        TitleGenre(title=third, genre=comedy),
+    ])
+    return first, second, third
+
+
+def filtered_names(query):
+    response = APIClient().get(reverse('api:v1_titles-list') + query)
+    assert response.status_code == 200
+    return sorted(title['name'] for title in response.data['results'])
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_genre_exact_match(self, titles):
+        assert filtered_names('?genre=drama') == ['Первое'], (
+            'Фильтр по жанру должен сравнивать слаг целиком'
+        )
+
+    def test_genre_multiple_values(self, titles):
+        assert filtered_names('?genre=drama,drama-comedy') == [
+            'Второе', 'Первое'
+        ]
+        assert filtered_names('?genre=comedy') == ['Первое', 'Третье'], (
+            'Произведение с несколькими жанрами не должно дублироваться'
+        )
+
+    def test_unknown_slug(self, titles):
+        assert filtered_names('?genre=unknown') == []
+
+    def test_category_exact_match(self, titles):
+        assert filtered_names('?category=movie') == ['Первое', 'Третье']
+        assert filtered_names('?category=movie,moviebook') == [
+            'Второе', 'Первое', 'Третье'
+        ]
+
+    @pytest.mark.skipif(
+        connection.vendor != 'postgresql',
+        reason='планы запросов проверяются только на PostgreSQL'
+    )
+    def test_genre_filter_uses_index(self, titles):
+        from api.filters import TitleFilter
+        from reviews.models import Title
+
+        queryset = TitleFilter(
+            {'genre': 'drama,comedy'}, queryset=Title.objects.all()
+        ).qs
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        plan = queryset.explain()
+        assert 'titlegenre_genre_title_idx' in plan, (
+            f'Фильтр по жанру должен использовать индекс:\n{plan}'
+        )
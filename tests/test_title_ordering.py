@@ -0,0 +1,113 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def ranked_titles():
+    from reviews.models import Category, Genre, Title, TitleGenre
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    rows = (
+        ('Альфа', movie, 6.0, 3, 1990),
+        ('Бета', movie, None, 0, 2000),
+        ('Гамма', movie, 9.0, 1, 1980),
+        ('Дельта', book, 8.0, 5, 2010),
+    )
+    titles = {}
+    for name, category, rating, reviews_count, year in rows:
+        titles[name] = Title.objects.create(name=name, year=year,
+                                            category=category)
+        Title.objects.filter(pk=titles[name].pk).update(
+            rating=rating, reviews_count=reviews_count
+        )
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title=titles[name], genre=drama)
+        for name in ('Альфа', 'Бета', 'Дельта')
+    )
+    return titles
+
+
+def names(response):
+    assert response.status_code == 200, response.data
+    results = response.data
+    if isinstance(results, dict):
+        results = results['results']
+    return [title['name'] for title in results]
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    def test_rating_nulls_last(self, ranked_titles):
+        client = APIClient()
+
+        assert names(client.get('/api/v1/titles/?ordering=-rating')) == [
+            'Гамма', 'Дельта', 'Альфа', 'Бета'
+        ]
+        assert names(client.get('/api/v1/titles/?ordering=rating')) == [
+            'Альфа', 'Дельта', 'Гамма', 'Бета'
+        ], 'Произведения без рейтинга должны идти в конце'
+
+    def test_cursor_ordering(self, ranked_titles):
+        client = APIClient()
+
+        response = client.get('/api/v1/titles/?ordering=-reviews_count'
+                              '&paginator=cursor')
+
+        assert names(response) == ['Дельта', 'Альфа', 'Гамма', 'Бета']
+        response = client.get('/api/v1/titles/?ordering=rating'
+                              '&paginator=cursor')
+        assert response.status_code == 400, (
+            'Курсор не должен молча терять произведения без рейтинга'
+        )
+
+    @pytest.mark.parametrize('ordering', ('reviews_count', '-year', 'name'))
+    def test_cursor_walks_ties(self, ordering):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i % 3}', year=2000 + i % 2)
+            for i in range(13)
+        )
+        expected = list(Title.objects.values_list('id', flat=True))
+        client = APIClient()
+        url = f'/api/v1/titles/?ordering={ordering}&paginator=cursor'
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, response.data
+            pages.append([title['id'] for title in
+                          response.data['results']])
+            url = response.data['next']
+        seen = [pk for page in pages for pk in page]
+        assert sorted(seen) == sorted(expected), (
+            'Курсор должен пройти все произведения с одинаковыми '
+            'значениями поля сортировки ровно по одному разу'
+        )
+        assert len(pages) == 3
+        url = response.data['previous']
+        for page in reversed(pages[:-1]):
+            response = client.get(url)
+            assert [title['id'] for title in
+                    response.data['results']] == page
+            url = response.data['previous']
+        assert url is None
+
+    def test_invalid_cursor(self, ranked_titles):
+        response = APIClient().get('/api/v1/titles/?cursor=bm90LWpzb24')
+        assert response.status_code == 404
+
+    def test_top_titles(self, ranked_titles):
+        client = APIClient()
+
+        assert names(client.get('/api/v1/categories/movie/top/')) == [
+            'Гамма', 'Альфа', 'Бета'
+        ]
+        assert names(client.get('/api/v1/genres/drama/top/'
+                                '?by=reviews_count&limit=2')) == [
+            'Дельта', 'Альфа'
+        ]
+        assert client.get('/api/v1/genres/drama/top/?limit=1000'
+                          ).status_code == 400
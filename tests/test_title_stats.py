@@ -0,0 +1,89 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def rated_title(django_user_model):
+    from reviews.models import Category, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    titles = [Title.objects.create(name=f'Фильм {i}', year=2000,
+                                   category=category) for i in range(6)]
+    authors = [
+        django_user_model.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+        for i in range(4)
+    ]
+    for author, score in zip(authors, (10, 10, 7, 3)):
+        Review.objects.create(title=titles[0], author=author,
+                              text='Отзыв', score=score)
+    for title in titles[1:]:
+        Review.objects.create(title=title, author=authors[0],
+                              text='Отзыв', score=5)
+    return titles[0]
+
+
+def histogram(title):
+    from reviews.models import TitleStats
+
+    stats = TitleStats.objects.get(title=title)
+    return stats.reviews_count, {score: count for score, count
+                                 in stats.scores.items() if count}
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_kept_current_on_review_changes(self, rated_title):
+        from reviews.models import TitleStats
+
+        assert histogram(rated_title) == (4, {10: 2, 7: 1, 3: 1})
+
+        review = rated_title.reviews.get(score=3)
+        review.score = 7
+        review.save()
+        assert histogram(rated_title) == (4, {10: 2, 7: 2}), (
+            'Смена оценки должна переносить отзыв между корзинами'
+        )
+
+        rated_title.reviews.filter(score=10).first().delete()
+        assert histogram(rated_title) == (3, {10: 1, 7: 2})
+
+        TitleStats.objects.filter(title=rated_title).delete()
+        author = rated_title.reviews.get(score=10).author
+        rated_title.reviews.get(score=10).delete()
+        rated_title.reviews.create(author=author, text='Отзыв', score=1)
+        assert histogram(rated_title) == (3, {7: 2, 1: 1}), (
+            'Отсутствующая статистика должна строиться по отзывам'
+        )
+
+        rated_title.delete()
+        assert not TitleStats.objects.filter(pk=rated_title.pk).exists()
+
+    def test_stats_endpoint(self, rated_title):
+        url = reverse('api:v1_titles-stats', args=(rated_title.id,))
+
+        response = APIClient().get(url)
+
+        assert response.status_code == 200
+        assert response.data['reviews_count'] == 4
+        assert response.data['rating'] == 7.5
+        assert response.data['scores']['10'] == 2
+        assert response.data['scores']['1'] == 0
+
+    def test_optional_serializer_field(self, rated_title,
+                                       assert_query_budget):
+        url = reverse('api:v1_titles-list')
+        assert 'stats' not in APIClient().get(url).data['results'][0]
+
+        response = assert_query_budget(APIClient(), url + '?stats=1', 3)
+
+        stats = {title['id']: title['stats']
+                 for title in response.data['results']}
+        assert stats[rated_title.id]['reviews_count'] == 4, (
+            'Со stats=1 статистика должна выводиться без запросов на '
+            'каждое произведение'
+        )
+        assert all(item['reviews_count'] == 1 for title_id, item
+                   in stats.items() if title_id != rated_title.id)
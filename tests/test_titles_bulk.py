@@ -0,0 +1,123 @@
+import json
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    from reviews.models import Category, Genre
+
+    Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+    admin = django_user_model.objects.create(
+        username='admin', email='admin@yamdb.ru', role='admin'
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def item(name, **fields):
+    return dict({'name': name, 'year': 2000, 'category': 'movie',
+                 'genre': ['drama']}, **fields)
+
+
+def titles():
+    from reviews.models import Title
+
+    return sorted(Title.objects.values_list('name', flat=True))
+
+
+@pytest.mark.django_db
+class TestTitlesBulk:
+
+    def test_create(self, admin_client):
+        from reviews.models import TitleGenre
+
+        response = admin_client.post(URL, [
+            item('Первое', genre=['drama', 'comedy', 'drama']),
+            item('Второе'),
+        ], format='json')
+
+        assert response.status_code == 201, response.data
+        assert [title['genre'] for title in response.data] == [
+            ['drama', 'comedy'], ['drama']
+        ], 'Повторы жанров в ответе должны быть убраны, как и при вставке'
+        assert all(title['id'] for title in response.data)
+        assert titles() == ['Второе', 'Первое']
+        assert TitleGenre.objects.count() == 3
+
+    def test_ndjson(self, admin_client):
+        body = '\n'.join(json.dumps(data) for data in (
+            item('Первое'), item('Второе')
+        )) + '\n'
+
+        response = admin_client.post(
+            URL, body, content_type='application/x-ndjson'
+        )
+
+        assert response.status_code == 201, response.data
+        assert titles() == ['Второе', 'Первое']
+
+    def test_item_errors_reject_batch(self, admin_client):
+        response = admin_client.post(URL, [
+            item('Первое'),
+            item('Второе', year=3000),
+            item('Третье', genre=['unknown']),
+        ], format='json')
+
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert set(response.data[1]) == {'year'}
+        assert set(response.data[2]) == {'genre'}
+        assert titles() == [], 'Пакет с ошибкой не должен создавать ничего'
+
+    def test_duplicates(self, admin_client):
+        from reviews.models import Category, Title
+
+        Title.objects.create(name='Старое', year=1990,
+                             category=Category.objects.get(slug='movie'))
+
+        response = admin_client.post(URL, [
+            item('Первое'), item('Первое'), item('Старое'),
+        ], format='json')
+
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert 'non_field_errors' in response.data[1], (
+            'Повтор внутри пакета должен быть ошибкой элемента'
+        )
+        assert 'non_field_errors' in response.data[2]
+        assert titles() == ['Старое']
+
+    def test_concurrent_duplicate(self, admin_client):
+        from api.serializers import TitleBulkListSerializer
+        from reviews.models import Category, Title
+
+        Title.objects.create(name='Первое', year=1990,
+                             category=Category.objects.get(slug='movie'))
+        # Проверка прошла раньше, чем параллельный запрос вставил строку.
+        with mock.patch.object(TitleBulkListSerializer, 'get_unique_errors',
+                               return_value=[]):
+            response = admin_client.post(URL, [
+                item('Второе'), item('Первое'),
+            ], format='json')
+
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.data
+        assert titles() == ['Первое']
+
+    def test_max_items(self, admin_client, settings):
+        settings.TITLES_BULK_MAX_ITEMS = 2
+
+        response = admin_client.post(URL, [
+            item('Первое'), item('Второе'), item('Третье'),
+        ], format='json')
+
+        assert response.status_code == 400
+        assert titles() == []